@@ -1,18 +1,28 @@
 # bot.py
 import time
 import csv
+import asyncio
 import sqlite3
-import pandas as pd
 from io import BytesIO
 from datetime import datetime, timedelta
 from core.planos import carregar_planos_ativos
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationBuilder, CommandHandler, ContextTypes, ConversationHandler, MessageHandler, filters, CallbackQueryHandler
 from config import TELEGRAM_TOKEN
-from core.fechamento_lotofacil import gerar_fechamento as gerar_fechamento_lotofacil, carregar_historico as carregar_historico_lotofacil
-from core.fechamento_megasena import  gerar_fechamento as gerar_fechamento_megasena,  carregar_historico as carregar_historico_megasena
-from core.backtest_lotofacil import rodar_backtest
-from core.backtest_megasena import rodar_backtest as rodar_backtest_megasena
+from core.fechamento_lotofacil import gerar_fechamento as gerar_fechamento_lotofacil
+from core.fechamento_megasena import  gerar_fechamento as gerar_fechamento_megasena
+from core.fechamento_lotofacil import gerar_fechamento_misto as gerar_fechamento_misto_lotofacil
+from core.fechamento_megasena import gerar_fechamento_misto as gerar_fechamento_misto_megasena
+from core.backtest_lotofacil import rodar_backtest, rodar_backtest_progressivo
+from core.backtest_megasena import rodar_backtest as rodar_backtest_megasena, rodar_backtest_progressivo as rodar_backtest_progressivo_megasena
+from core.motor_backtest import backtest_ultimos, backtest_financeiro, backtest_carteira
+from core.combinatoria import compactar_jogos, expandir_jogos
+from core.cobertura import verificar_garantia
+from core.filtros import FILTROS_CLASSICOS, descrever as descrever_filtros
+from core.estatisticas import (
+    carregar_estatisticas, dezenas_sorteadas, mais_frequentes, mais_atrasadas,
+    pares_mais_frequentes, trios_mais_frequentes
+)
 from fpdf import FPDF
 import mercadopago
 from config import MP_ACCESS_TOKEN
@@ -24,6 +34,8 @@ DB_PATH = "db/loterias.db"
 
 # ================= ESTADOS =================
 SESSION_TIMEOUT = 300  # 5 minutos (em segundos)
+CONCURSOS_RECENTES = 100  # janela do resumo de backtest
+ROTULO_MISTO = "🧮 Misto (otimizado)"  # tamanhos de jogo escolhidos pelo orçamento
 
 APRESENTACAO = "APRESENTACAO"
 CIENCIA_RISCO = "CIENCIA_RISCO"
@@ -511,6 +523,24 @@ def consumir_credito(telegram_id: int) -> bool:
     return True
 
 
+def devolver_credito(telegram_id: int):
+    """
+    Devolve o crédito consumido por um pedido que falhou na validação
+    (só plano pré-pago; nos demais consumir_credito não desconta nada).
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        UPDATE usuarios
+        SET creditos = COALESCE(creditos, 0) + 1
+        WHERE telegram_id = ? AND plano_pre
+    """, (telegram_id,))
+
+    conn.commit()
+    conn.close()
+
+
 
 # ================= MENU LOTERIAS =================
 async def menu_loterias(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -690,27 +720,9 @@ async def escolher_base(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # ✅ registra tipo corretamente para logs
         context.user_data["tipo_base"] = "automatico"
 
-        if loteria == "lotofacil":
-            historico = carregar_historico_lotofacil()
-            base = sorted(
-                {
-                    int(n)
-                    for jogo in historico
-                    for n in jogo
-                    if str(n).isdigit()
-                }
-            )
-            opcoes = list(range(15, 21))
-        else:
-            historico = carregar_historico_megasena()
-            base = sorted(
-                {
-                    int(n)
-                    for n in historico.values.flatten()
-                    if pd.notna(n)
-                }
-            )
-            opcoes = list(range(6, 11))
+        # 📊 dezenas já sorteadas (estatísticas materializadas)
+        base = dezenas_sorteadas(loteria)
+        opcoes = list(range(15, 21)) if loteria == "lotofacil" else list(range(6, 11))
 
         if not base:
             raise ValueError("Base histórica vazia ou inválida.")
@@ -721,6 +733,7 @@ async def escolher_base(update: Update, context: ContextTypes.DEFAULT_TYPE):
             [InlineKeyboardButton(str(d), callback_data=f"qtd_{d}")]
             for d in opcoes
         ]
+        keyboard.append([InlineKeyboardButton(ROTULO_MISTO, callback_data="qtd_mix")])
 
         await query.message.reply_text(
             f"Base histórica selecionada: {', '.join(map(str, base))}\n"
@@ -780,6 +793,7 @@ async def base_manual(update: Update, context: ContextTypes.DEFAULT_TYPE):
             [InlineKeyboardButton(str(d), callback_data=f"qtd_{d}")]
             for d in opcoes
         ]
+        keyboard.append([InlineKeyboardButton(ROTULO_MISTO, callback_data="qtd_mix")])
 
         await query.message.reply_text(
             f"✅ Base definida:\n{', '.join(map(str, sorted(dados['numeros_base'])))}\n\n"
@@ -859,6 +873,7 @@ async def qtd_dezenas(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Cria teclado (uma coluna por botão)
     keyboard = [[InlineKeyboardButton(str(d), callback_data=f"qtd_{d}")] for d in opcoes]
+    keyboard.append([InlineKeyboardButton(ROTULO_MISTO, callback_data="qtd_mix")])
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     await update.message.reply_text(
@@ -884,8 +899,13 @@ async def selecionar_qtd_dezenas(update: Update, context: ContextTypes.DEFAULT_T
         return ConversationHandler.END
 
     if query.data.startswith("qtd_"):
-        qtd = int(query.data.split("_")[1])
-        user_data["dezenas_por_jogo"] = qtd
+        # 🧮 misto: o otimizador de orçamento escolhe os tamanhos dos jogos
+        user_data["mix"] = query.data == "qtd_mix"
+        if user_data["mix"]:
+            user_data["dezenas_por_jogo"] = 15 if loteria == "lotofacil" else 6
+        else:
+            user_data["dezenas_por_jogo"] = int(query.data.split("_")[1])
+        qtd = descrever_dezenas(user_data)
 
         # opções de alvo mínimo
         opcoes_alvo = [11, 12, 13, 14] if loteria == "lotofacil" else [4, 5]
@@ -981,23 +1001,10 @@ async def orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # substitui vírgula por ponto e converte para float
         orc = float(update.message.text.replace(",", "."))
         user_data["orcamento"] = orc
+        user_data["filtros"] = None
+        user_data["modo"] = "cobertura"
 
-        numeros_str = ", ".join(map(str, user_data.get("numeros_base", [])))
-        msg_confirma = (
-            "🔎 Confirme os parâmetros para gerar a análise:\n\n"
-            f"Loteria            : {loteria.capitalize()}\n"
-            f"Números base       : {numeros_str}\n"
-            f"Dezenas por jogo   : {user_data.get('dezenas_por_jogo')}\n"
-            f"Mínimo de acertos  : {user_data.get('minimo_acertos')}\n"
-            f"Orçamento (R$)     : {user_data.get('orcamento'):.2f}\n\n"
-            "Deseja confirmar?"
-        )
-
-        keyboard = [
-            [InlineKeyboardButton("✅ Confirmar", callback_data="confirmar")],
-            [InlineKeyboardButton("🔄 Reiniciar", callback_data="restart")]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        msg_confirma, reply_markup = montar_confirmacao(user_data)
 
         await update.message.reply_text(msg_confirma, reply_markup=reply_markup)
         return CONFIRMAR_ORCAMENTO
@@ -1009,6 +1016,45 @@ async def orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ORCAMENTO
 
 
+def descrever_dezenas(user_data):
+    return "misto (otimizado)" if user_data.get("mix") else user_data.get("dezenas_por_jogo")
+
+
+def montar_confirmacao(user_data):
+    loteria = user_data.get("loteria")
+    numeros_str = ", ".join(map(str, user_data.get("numeros_base", [])))
+    msg_confirma = (
+        "🔎 Confirme os parâmetros para gerar a análise:\n\n"
+        f"Loteria            : {loteria.capitalize()}\n"
+        f"Números base       : {numeros_str}\n"
+        f"Dezenas por jogo   : {descrever_dezenas(user_data)}\n"
+        f"Mínimo de acertos  : {user_data.get('minimo_acertos')}\n"
+        f"Orçamento (R$)     : {user_data.get('orcamento'):.2f}\n"
+        f"Filtros            : {descrever_filtros(user_data.get('filtros'))}\n"
+        f"Modo               : {user_data.get('modo', 'cobertura')}\n\n"
+        "Deseja confirmar?"
+    )
+
+    keyboard = [[InlineKeyboardButton("✅ Confirmar", callback_data="confirmar")]]
+
+    # 🧰 faixas clássicas valem para apostas simples (15 / 6 dezenas)
+    if user_data.get("dezenas_por_jogo") == (15 if loteria == "lotofacil" else 6) and not user_data.get("mix"):
+        rotulo = "🧰 Remover filtros" if user_data.get("filtros") else "🧰 Aplicar filtros clássicos"
+        keyboard.append([InlineKeyboardButton(rotulo, callback_data="filtros")])
+
+    # 🌐 cobertura (garantia) x diversidade (jogos pouco sobrepostos)
+    rotulo_modo = (
+        "🌐 Usar modo diversidade" if user_data.get("modo", "cobertura") == "cobertura"
+        else "🎯 Usar modo cobertura"
+    )
+    if not user_data.get("mix"):
+        keyboard.append([InlineKeyboardButton(rotulo_modo, callback_data="modo")])
+
+    keyboard.append([InlineKeyboardButton("🔄 Reiniciar", callback_data="restart")])
+
+    return msg_confirma, InlineKeyboardMarkup(keyboard)
+
+
 # --- CONFIRMAR ORCAMENTO ---
 async def confirmar_orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
@@ -1023,6 +1069,20 @@ async def confirmar_orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
         return ConversationHandler.END
 
+    if query.data == "filtros":
+        user_data["filtros"] = None if user_data.get("filtros") else dict(FILTROS_CLASSICOS[loteria])
+
+        msg_confirma, reply_markup = montar_confirmacao(user_data)
+        await query.edit_message_text(msg_confirma, reply_markup=reply_markup)
+        return CONFIRMAR_ORCAMENTO
+
+    if query.data == "modo":
+        user_data["modo"] = "diversidade" if user_data.get("modo", "cobertura") == "cobertura" else "cobertura"
+
+        msg_confirma, reply_markup = montar_confirmacao(user_data)
+        await query.edit_message_text(msg_confirma, reply_markup=reply_markup)
+        return CONFIRMAR_ORCAMENTO
+
     if query.data == "confirmar":
 
         user_id = query.from_user.id
@@ -1069,22 +1129,40 @@ async def confirmar_orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE
             # ===============================
             # 🎯 GERA FECHAMENTO
             # ===============================
-            if loteria == "lotofacil":
-                resultado = gerar_fechamento_lotofacil(
+            # a otimização da cobertura leva alguns segundos: fora do event loop
+            if user_data.get("mix"):
+                resultado = await asyncio.to_thread(
+                    gerar_fechamento_misto_lotofacil if loteria == "lotofacil" else gerar_fechamento_misto_megasena,
+                    numeros_base=numeros_base_limpos,
+                    minimo_acertos=user_data["minimo_acertos"],
+                    orcamento=user_data["orcamento"],
+                )
+            elif loteria == "lotofacil":
+                resultado = await asyncio.to_thread(
+                    gerar_fechamento_lotofacil,
                     numeros_base=numeros_base_limpos,
                     minimo_acertos=user_data["minimo_acertos"],
                     dezenas_por_jogo=user_data["dezenas_por_jogo"],
                     orcamento=user_data["orcamento"],
+                    filtros=user_data.get("filtros"),
+                    modo=user_data.get("modo", "cobertura"),
                 )
             else:
-                resultado = gerar_fechamento_megasena(
+                resultado = await asyncio.to_thread(
+                    gerar_fechamento_megasena,
                     numeros_base=numeros_base_limpos,
                     minimo_acertos=user_data["minimo_acertos"],
                     dezenas_por_jogo=user_data["dezenas_por_jogo"],
                     orcamento=user_data["orcamento"],
+                    filtros=user_data.get("filtros"),
+                    modo=user_data.get("modo", "cobertura"),
                 )
 
-            user_data["resultado"] = resultado
+            # 🗜️ guarda os jogos compactados (rank colex), não as listas
+            user_data["resultado"] = {
+                "jogos_compactos": compactar_jogos(resultado["jogos"]),
+                "estatisticas": resultado["estatisticas"],
+            }
             user_data["backtest_executado"] = False
 
             # ===============================
@@ -1125,10 +1203,12 @@ async def confirmar_orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE
                 creditos=creditos_restantes,
                 tipo_dezenas=tipo_dezenas,
                 dezenas_selecionadas=numeros_base_limpos,
-                qtd_dezenas=user_data["dezenas_por_jogo"],
+                qtd_dezenas=0 if user_data.get("mix") else user_data["dezenas_por_jogo"],
                 alvo=user_data["minimo_acertos"],
                 orcamento=user_data["orcamento"],
                 qtd_jogos_gerados=resultado["estatisticas"]["qtd_jogos"],
+                semente=resultado["estatisticas"].get("semente"),
+                design=resultado["estatisticas"].get("design"),
             )
 
             context.user_data["id_log"] = id_log  # 🔥 ESSENCIAL
@@ -1137,13 +1217,59 @@ async def confirmar_orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE
             # ===============================
             # 📊 MENSAGEM AO USUÁRIO
             # ===============================
+            # 📐 garantia conferida contra todos os sorteios possíveis da base
+            garantia = await asyncio.to_thread(
+                verificar_garantia,
+                resultado["jogos"],
+                numeros_base_limpos,
+                15 if loteria == "lotofacil" else 6,
+                user_data["minimo_acertos"],
+            )
+            if garantia is not None:
+                linha_cobertura = (
+                    f"📐 Garantia comprovada: {garantia['fracao'] * 100:.1f}% dos "
+                    f"{formatar_milhar(garantia['sorteios_total'])} sorteios possíveis da base "
+                    f"dão {user_data['minimo_acertos']}+ acertos\n"
+                    f"🔒 Pior caso (todas as dezenas na base): {garantia['minimo_garantido']} acertos\n"
+                )
+            else:
+                linha_cobertura = ""
+            sobreposicao = resultado["estatisticas"].get("sobreposicao_maxima")
+            if sobreposicao is not None:
+                linha_cobertura += f"🌐 Máximo de dezenas em comum entre dois jogos: {sobreposicao}\n"
+
+            mix = resultado["estatisticas"].get("mix")
+            if mix:
+                linha_cobertura += (
+                    "🧮 Mix: " + ", ".join(f"{qtd}×{n}" for n, qtd in sorted(mix.items(), key=lambda item: int(item[0]))) + " dezenas\n"
+                    f"📈 Cobertura estimada: {resultado['estatisticas']['cobertura_estimada'] * 100:.1f}% · "
+                    f"{resultado['estatisticas']['premios_esperados']:.2f} apostas premiadas esperadas por sorteio\n"
+                )
+                sobra = resultado["estatisticas"]["orcamento"] - resultado["estatisticas"]["valor_total"]
+                if resultado["estatisticas"].get("cobertura_saturada") and sobra >= 0.01:
+                    linha_cobertura += f"💰 R$ {sobra:.2f} do orçamento não foram gastos (mais jogos não aumentariam a cobertura)\n"
+
+            completados = resultado["estatisticas"].get("jogos_completados", 0)
+            if resultado["estatisticas"].get("cobertura_interrompida"):
+                linha_cobertura += "⏱️ Busca da cobertura interrompida no limite de processamento\n"
+            if completados:
+                linha_cobertura += f"🎲 {completados} jogos aleatórios completaram o orçamento\n"
+
+            economizados = resultado["estatisticas"].get("jogos_economizados", 0)
+            if economizados:
+                linha_cobertura += f"✂️ Otimização: {economizados} jogos a menos com a mesma garantia\n"
+
             msg = (
                 f"✅ *Análise concluída!*\n\n"
                 f"🎯 Loteria: {loteria.capitalize()}\n"
                 f"📊 Jogos gerados: {resultado['estatisticas']['qtd_jogos']}\n"
-                f"🎲 Dezenas por jogo: {user_data['dezenas_por_jogo']}\n"
-                f"🏆 Mínimo garantido: {resultado['estatisticas']['minimo_acertos']}\n"
-                f"💰 Orçamento usado: R$ {resultado['estatisticas']['orcamento']:.2f}\n\n"
+                f"🎲 Dezenas por jogo: {descrever_dezenas(user_data)}\n"
+                f"🏆 Mínimo pedido: {resultado['estatisticas']['minimo_acertos']}\n"
+                f"{linha_cobertura}"
+                f"💰 Orçamento usado: R$ {resultado['estatisticas']['valor_total']:.2f}"
+                f" de R$ {resultado['estatisticas']['orcamento']:.2f}\n"
+                f"🔑 Semente: {resultado['estatisticas'].get('semente')}"
+                f" · fechamento: {resultado['estatisticas'].get('design') or 'nenhum'}\n\n"
                 "📁 Use as opções abaixo para baixar os jogos completos."
             )
 
@@ -1165,8 +1291,11 @@ async def confirmar_orcamento(update: Update, context: ContextTypes.DEFAULT_TYPE
             return OPCOES_JOGOS
 
         except ValueError as e:
+            # filtros impossíveis, orçamento abaixo do preço etc.: nada foi gerado
+            devolver_credito(user_id)
             await query.message.reply_text(
-                f"⚠️ {e}\n💰 Por favor, informe um novo valor de orçamento (R$):"
+                f"⚠️ {e}\n🔁 Nenhum crédito foi consumido.\n"
+                f"💰 Por favor, informe um novo valor de orçamento (R$):"
             )
             return ORCAMENTO
 
@@ -1190,7 +1319,9 @@ def registrar_log(
     csv_jogos: bool = False,
     pdf_jogos: bool = False,
     backtest: bool = False,
-    csv_backtest: bool = False
+    csv_backtest: bool = False,
+    semente: int | None = None,
+    design: str | None = None
 ) -> int:
     """
     Registra uma transação completa na tabela logs e
@@ -1234,8 +1365,10 @@ def registrar_log(
             csv_jogos,
             pdf_jogos,
             backtest,
-            csv_backtest
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            csv_backtest,
+            semente,
+            design
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """, (
         datetime.now().isoformat(),
         loteria,
@@ -1252,6 +1385,8 @@ def registrar_log(
         int(bool(pdf_jogos)),
         int(bool(backtest)),
         int(bool(csv_backtest)),
+        int(semente) if semente is not None else None,
+        design,
     ))
 
     id_log = cursor.lastrowid  # 🔑 ID DA TRANSAÇÃO
@@ -1309,6 +1444,10 @@ def montar_keyboard_opcoes(user_data, plano_pre=False):
     return InlineKeyboardMarkup(botoes)
 
 
+def formatar_milhar(valor: int) -> str:
+    return f"{valor:,}".replace(",", ".")
+
+
 def atualizar_log(id_log: int, campo: str):
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
@@ -1337,6 +1476,8 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return ConversationHandler.END
 
+    jogos = expandir_jogos(resultado["jogos_compactos"])
+
     # ---------------- BACKTEST ----------------
     if query.data == "backtest":
         user_id = query.from_user.id
@@ -1359,12 +1500,34 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return OPCOES_JOGOS
 
         if loteria == "lotofacil":
-            bt_result = rodar_backtest(resultado["jogos"])
+            gerador = rodar_backtest_progressivo(jogos)
             pontos_range = range(11, 16)
         else:
-            bt_result = rodar_backtest_megasena(resultado["jogos"])
+            gerador = rodar_backtest_progressivo_megasena(jogos)
             pontos_range = range(4, 7)
 
+        # 🔄 progresso em uma única mensagem editada
+        msg_progresso = await query.message.reply_text("⏳ Rodando backtest...")
+        bt_result = []
+        ultima_edicao = 0.0
+
+        while True:
+            parcial = await asyncio.to_thread(next, gerador, None)
+            if parcial is None:
+                break
+
+            bt_result.extend(parcial["resultado"])
+
+            # evita flood do Telegram: no máximo 1 edição por segundo
+            if time.time() - ultima_edicao >= 1 and parcial["processados"] < parcial["total"]:
+                ultima_edicao = time.time()
+                await msg_progresso.edit_text(
+                    f"⏳ Rodando backtest... "
+                    f"{formatar_milhar(parcial['processados'])}/{formatar_milhar(parcial['total'])} jogos"
+                )
+
+        await msg_progresso.edit_text("✅ Backtest finalizado.")
+
         user_data["backtest"] = bt_result
         user_data["backtest_executado"] = True
 
@@ -1377,12 +1540,45 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         texto_resumo = (
             f"📊 *Backtest concluído ({loteria.upper()})*\n\n"
             f"Qtd de jogos       : {len(bt_result)}\n"
-            f"Dezenas por jogo   : {user_data['dezenas_por_jogo']}\n\n"
+            f"Dezenas por jogo   : {descrever_dezenas(user_data)}\n\n"
         )
 
         for i in pontos_range:
             texto_resumo += f"{i} pontos : {resumo[i]}\n"
 
+        # 🎟️ jogos com mais dezenas que o sorteio contêm várias apostas simples
+        if any(len(j) > pontos_range[-1] for j in jogos):
+            texto_resumo += "\n🎟️ *Apostas simples premiadas*\n"
+            for i in pontos_range:
+                texto_resumo += f"{i} pontos : {sum(r['apostas'][i] for r in bt_result)}\n"
+
+        # 📅 mesma conferência restrita aos concursos mais recentes
+        recentes = await asyncio.to_thread(
+            backtest_ultimos, loteria, jogos, CONCURSOS_RECENTES
+        )
+        texto_resumo += f"\n📅 *Últimos {CONCURSOS_RECENTES} concursos*\n"
+        for i in pontos_range:
+            texto_resumo += f"{i} pontos : {sum(r[i] for r in recentes)}\n"
+
+        # 🎯 garantia do conjunto: melhor acerto entre todos os jogos por concurso
+        alvo_min = user_data["minimo_acertos"]
+        carteira = await asyncio.to_thread(backtest_carteira, loteria, jogos, alvo_min)
+        texto_resumo += (
+            f"\n🎯 *Conjunto de jogos*\n"
+            f"{alvo_min}+ pontos em {carteira['concursos_com_minimo']} de "
+            f"{carteira['concursos']} concursos ({carteira['taxa_minimo'] * 100:.1f}%)\n"
+        )
+
+        # 💰 quanto o conjunto teria pago (rateio real de cada concurso)
+        financeiro = await asyncio.to_thread(backtest_financeiro, loteria, jogos)
+        total_fin = financeiro["total"]
+        texto_resumo += (
+            f"\n💰 *Retorno histórico* ({total_fin['concursos']} concursos)\n"
+            f"Custo   : R$ {total_fin['custo']:.2f}\n"
+            f"Retorno : R$ {total_fin['retorno']:.2f}\n"
+            f"ROI     : {total_fin['roi'] * 100:.1f}%\n"
+        )
+
         texto_resumo += (
             "\n🏆 *Melhor jogo*\n"
             f"Jogo : {melhor_jogo['jogo']}\n"
@@ -1410,9 +1606,9 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         with open(nome_arquivo, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f, delimiter=";")
             writer.writerow(
-                ["Jogo"] + [f"D{i+1}" for i in range(user_data["dezenas_por_jogo"])]
+                ["Jogo"] + [f"D{i+1}" for i in range(max(len(jogo) for jogo in jogos))]
             )
-            for idx, jogo in enumerate(resultado["jogos"], start=1):
+            for idx, jogo in enumerate(jogos, start=1):
                 writer.writerow([idx] + list(jogo))
 
         with open(nome_arquivo, "rb") as f:
@@ -1433,11 +1629,20 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         nome_arquivo = f"backtest_{loteria}.csv"
         pontos_range = range(11, 16) if loteria == "lotofacil" else range(4, 7)
 
+        # colunas de apostas simples só quando há jogos com mais dezenas que o sorteio
+        com_apostas = any(len(j) > pontos_range[-1] for j in jogos)
+
         with open(nome_arquivo, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f, delimiter=";")
-            writer.writerow(["Jogo"] + [f"{i}_pontos" for i in pontos_range])
+            writer.writerow(
+                ["Jogo"] + [f"{i}_pontos" for i in pontos_range]
+                + ([f"apostas_{i}_pontos" for i in pontos_range] if com_apostas else [])
+            )
             for r in backtest:
-                writer.writerow([r["jogo"]] + [r[i] for i in pontos_range])
+                writer.writerow(
+                    [r["jogo"]] + [r[i] for i in pontos_range]
+                    + ([r["apostas"][i] for i in pontos_range] if com_apostas else [])
+                )
 
         with open(nome_arquivo, "rb") as f:
             await query.message.reply_document(document=f, filename=nome_arquivo)
@@ -1456,7 +1661,7 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         pdf.cell(0, 10, f"Jogos - {loteria.upper()}", ln=1, align="C")
         pdf.ln(4)
 
-        for idx, jogo in enumerate(resultado["jogos"], 1):
+        for idx, jogo in enumerate(jogos, 1):
             pdf.multi_cell(0, 8, f"Jogo {idx}: {', '.join(map(str, jogo))}")
 
         bio = BytesIO(pdf.output(dest="S").encode("latin1"))
@@ -1477,6 +1682,38 @@ async def opcoes_jogos(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return await menu_loterias(update, context)
 
 
+# ================= ESTATÍSTICAS =================
+async def estatisticas(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/estatisticas [lotofacil|megasena]: estatísticas derivadas do índice de concursos."""
+    loteria = (context.args[0].lower() if context.args else "lotofacil").replace("á", "a")
+    if loteria not in ("lotofacil", "megasena"):
+        await update.message.reply_text("Use /estatisticas lotofacil ou /estatisticas megasena")
+        return
+
+    dados = carregar_estatisticas(loteria)
+    frequencia = dados["frequencia"]
+    atraso = dados["atraso"]
+    atraso_maximo = dados["atraso_maximo"]
+
+    frequentes = ", ".join(f"{d} ({frequencia[d]})" for d in mais_frequentes(loteria, 10))
+    atrasadas = ", ".join(
+        f"{d} ({atraso[d]}/{atraso_maximo[d]})" for d in mais_atrasadas(loteria, 10)
+    )
+    pares = ", ".join(f"{a}-{b} ({n})" for a, b, n in pares_mais_frequentes(loteria, 5))
+    trios = ", ".join(f"{a}-{b}-{c} ({n})" for a, b, c, n in trios_mais_frequentes(loteria, 5))
+
+    await update.message.reply_text(
+        f"📊 *Estatísticas — {loteria.capitalize()}*\n"
+        f"Concursos: {formatar_milhar(dados['qtd_concursos'])} "
+        f"(até o {dados['ultimo_concurso']})\n\n"
+        f"🔥 Mais frequentes: {frequentes}\n\n"
+        f"⏳ Mais atrasadas (atual/máximo): {atrasadas}\n\n"
+        f"👥 Pares mais frequentes: {pares}\n\n"
+        f"👨‍👩‍👦 Trios mais frequentes: {trios}",
+        parse_mode="Markdown"
+    )
+
+
 # --- CANCEL ---
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("Operação cancelada.")
@@ -1515,6 +1752,9 @@ if __name__ == "__main__":
     # 1️⃣ registra o ConversationHandler
     app.add_handler(conv_handler)
 
+    # 📊 estatísticas (fora da conversa)
+    app.add_handler(CommandHandler("estatisticas", estatisticas))
+
     # 2️⃣ fallback global para callbacks órfãos (NÍVEL 2)
     app.add_handler(CallbackQueryHandler(callback_fallback))
 
@@ -1,48 +1,54 @@
-import sqlite3
-import pandas as pd
-from config import DB_PATH
+from core import historico, motor_backtest, tabela_lotofacil
 
 
 def carregar_historico():
-    conn = sqlite3.connect(DB_PATH)
+    """
+    Histórico da Lotofácil como lista de sets, lido do snapshot binário.
+    """
+    dezenas = historico.carregar_historico("lotofacil")["dezenas"]
+    return [set(linha) for linha in dezenas.tolist()]
 
-    df = pd.read_sql_query("""
-        SELECT dezena1, dezena2, dezena3, dezena4, dezena5,
-               dezena6, dezena7, dezena8, dezena9, dezena10,
-               dezena11, dezena12, dezena13, dezena14, dezena15
-        FROM concursos_lotofacil
-        ORDER BY concurso ASC
-    """, conn)
 
-    conn.close()
+def rodar_backtest(jogos):
+    """
+    Conta, para cada jogo, quantos concursos fizeram 11 a 15 pontos.
+    Jogos de 15 dezenas consultam a tabela pré-calculada (se construída);
+    os demais vão para o motor vetorizado (bitmask + popcount).
+    """
+    if jogos and tabela_lotofacil.disponivel() and all(len(j) == 15 for j in jogos):
+        return tabela_lotofacil.backtest_tabela(jogos)
 
-    return [set(row) for _, row in df.iterrows()]
+    return motor_backtest.rodar_backtest("lotofacil", jogos)
 
 
-def rodar_backtest(jogos):
-    historico = carregar_historico()
+def rodar_backtest_progressivo(jogos, jogos_por_bloco=2_000):
+    """
+    Gerador do backtest em blocos, para acompanhar o progresso.
+    Mesma regra do rodar_backtest: só jogos de 15 dezenas e tabela
+    construída usam a tabela pré-calculada.
+    """
+    jogos = list(jogos)
 
-    resultado = []
+    if jogos and tabela_lotofacil.disponivel() and all(len(j) == 15 for j in jogos):
+        return _progressivo_tabela(jogos, jogos_por_bloco)
 
-    for idx, jogo in enumerate(jogos, start=1):
-        jogo_set = set(jogo)
+    return motor_backtest.rodar_backtest_progressivo("lotofacil", jogos, jogos_por_bloco)
 
-        contagem = {
-            11: 0,
-            12: 0,
-            13: 0,
-            14: 0,
-            15: 0
-        }
 
-        for concurso in historico:
-            acertos = len(jogo_set & concurso)
-            if acertos >= 11:
-                contagem[acertos] += 1
+def _progressivo_tabela(jogos, jogos_por_bloco):
+    # mesmo formato de motor_backtest.rodar_backtest_progressivo
+    resumo = {f: 0 for f in tabela_lotofacil.FAIXAS}
 
-        resultado.append({
-            "jogo": idx,
-            **contagem
-        })
+    for inicio in range(0, len(jogos), jogos_por_bloco):
+        bloco = jogos[inicio:inicio + jogos_por_bloco]
+        resultado = tabela_lotofacil.backtest_tabela(bloco, inicio=inicio + 1)
 
-    return resultado
+        for f in resumo:
+            resumo[f] += sum(linha[f] for linha in resultado)
+
+        yield {
+            "processados": inicio + len(bloco),
+            "total": len(jogos),
+            "resultado": resultado,
+            "resumo": dict(resumo),
+        }
@@ -1,25 +1,14 @@
-import sqlite3
-from config import DB_PATH
-import pandas as pd
-import os
-
-DB_PATH = os.path.join("db", "loterias.db")
+from core import historico, motor_backtest
 
 def carregar_historico():
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT dezena1, dezena2, dezena3, dezena4, dezena5, dezena6 FROM concursos_megasena ORDER BY concurso ASC", conn)
-    conn.close()
-    return [set(row) for _, row in df.iterrows()]
+    """Histórico da Mega-Sena como lista de sets, lido do snapshot binário."""
+    dezenas = historico.carregar_historico("megasena")["dezenas"]
+    return [set(linha) for linha in dezenas.tolist()]
 
 def rodar_backtest(jogos):
-    historico = carregar_historico()
-    resultado = []
-    for idx, jogo in enumerate(jogos, start=1):
-        jogo_set = set(jogo)
-        contagem = {4: 0, 5: 0, 6: 0}  # Quadras, Quinas, Sena
-        for concurso in historico:
-            acertos = len(jogo_set & concurso)
-            if acertos >= 4:
-                contagem[acertos] += 1
-        resultado.append({"jogo": idx, **contagem})
-    return resultado
+    """Conta quadras, quinas e senas de cada jogo via motor vetorizado."""
+    return motor_backtest.rodar_backtest("megasena", jogos)
+
+def rodar_backtest_progressivo(jogos, jogos_por_bloco=2_000):
+    """Gerador do backtest em blocos, para acompanhar o progresso."""
+    return motor_backtest.rodar_backtest_progressivo("megasena", jogos, jogos_por_bloco)
@@ -0,0 +1,164 @@
+# core/biblioteca_coberturas.py
+import sqlite3
+import hashlib
+import numpy as np
+from config import DB_PATH
+from core.combinatoria import desranquear, ranquear
+
+
+# --------------------------------------------------
+# BIBLIOTECA DE FECHAMENTOS PRONTOS (SQLITE)
+# --------------------------------------------------
+# Chave (v, k, t, m):
+#   v = tamanho da base, k = dezenas por jogo,
+#   t = acertos garantidos, m = dezenas sorteadas.
+# Os jogos ficam no espaço local da base (dezenas 1..v) como ranks
+# colex uint32. Aplicar a uma base do usuário é trocar a dezena local i
+# por base[i - 1]: O(jogos), sem busca nenhuma.
+#
+# biblioteca_coberturas guarda o menor fechamento de cada chave;
+# biblioteca_versoes guarda todo fechamento já usado, pelo seu id (hash
+# da chave + ranks). O id vai para os parâmetros do cache e para o log,
+# e reabre os mesmos jogos mesmo depois que a biblioteca melhorar.
+_memoria = {}
+
+
+def _criar_tabela(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS biblioteca_coberturas (
+            v INTEGER NOT NULL,
+            k INTEGER NOT NULL,
+            t INTEGER NOT NULL,
+            m INTEGER NOT NULL,
+            qtd_jogos INTEGER NOT NULL,
+            ranks BLOB NOT NULL,
+            atualizado_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (v, k, t, m)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS biblioteca_versoes (
+            id TEXT PRIMARY KEY,
+            v INTEGER NOT NULL,
+            k INTEGER NOT NULL,
+            t INTEGER NOT NULL,
+            m INTEGER NOT NULL,
+            qtd_jogos INTEGER NOT NULL,
+            ranks BLOB NOT NULL,
+            criado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def id_design(v: int, k: int, t: int, m: int, ranks: np.ndarray) -> str:
+    dados = f"{v},{k},{t},{m}:".encode() + np.asarray(ranks, dtype="<u4").tobytes()
+    return hashlib.sha256(dados).hexdigest()[:16]
+
+
+def _registrar_versao(conn, chave: tuple, ranks: np.ndarray):
+    conn.execute("""
+        INSERT OR IGNORE INTO biblioteca_versoes (id, v, k, t, m, qtd_jogos, ranks)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (id_design(*chave, ranks), *chave, len(ranks), np.asarray(ranks, dtype="<u4").tobytes()))
+
+
+def buscar_design(v: int, k: int, t: int, m: int) -> np.ndarray | None:
+    """
+    Ranks (locais) do menor fechamento guardado, ou None.
+    """
+    chave = (v, k, t, m)
+    if chave in _memoria:
+        return _memoria[chave]
+
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    row = conn.execute(
+        "SELECT ranks FROM biblioteca_coberturas WHERE v = ? AND k = ? AND t = ? AND m = ?",
+        chave
+    ).fetchone()
+
+    ranks = np.frombuffer(row[0], dtype="<u4").copy() if row else None
+    if ranks is not None:
+        # fechamentos gravados antes do versionamento ganham seu id aqui
+        _registrar_versao(conn, chave, ranks)
+        conn.commit()
+        _memoria[chave] = ranks
+    conn.close()
+
+    return ranks
+
+
+def buscar_versao(id_: str) -> tuple | None:
+    """
+    ((v, k, t, m), ranks) de um fechamento pelo id, ou None.
+    """
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    row = conn.execute(
+        "SELECT v, k, t, m, ranks FROM biblioteca_versoes WHERE id = ?", (id_,)
+    ).fetchone()
+    conn.close()
+
+    if not row:
+        return None
+
+    return tuple(row[:4]), np.frombuffer(row[4], dtype="<u4").copy()
+
+
+def salvar_design(v: int, k: int, t: int, m: int, jogos_locais) -> bool:
+    """
+    Grava o fechamento (jogos com dezenas locais 1..v) se for menor que o
+    guardado. Retorna True se gravou.
+    """
+    atual = buscar_design(v, k, t, m)
+    if atual is not None and len(atual) <= len(jogos_locais):
+        return False
+
+    ranks = np.sort(ranquear(jogos_locais)).astype("<u4")
+
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    conn.execute("""
+        INSERT INTO biblioteca_coberturas (v, k, t, m, qtd_jogos, ranks, atualizado_em)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(v, k, t, m)
+        DO UPDATE SET
+            qtd_jogos = excluded.qtd_jogos,
+            ranks = excluded.ranks,
+            atualizado_em = CURRENT_TIMESTAMP
+    """, (v, k, t, m, len(ranks), ranks.tobytes()))
+    _registrar_versao(conn, (v, k, t, m), ranks)
+    conn.commit()
+    conn.close()
+
+    _memoria[(v, k, t, m)] = ranks
+    return True
+
+
+def aplicar_design(ranks: np.ndarray, k: int, base) -> list[list[int]]:
+    """
+    Traduz o fechamento local para as dezenas da base (ordenada).
+    """
+    base = np.asarray(sorted(int(n) for n in base), dtype=np.int64)
+    locais = desranquear(ranks, k).astype(np.int64) - 1
+
+    return base[locais].tolist()
+
+
+def para_local(jogos, base) -> list[list[int]]:
+    """
+    Inverso do aplicar_design: dezenas reais -> posições 1..v na base.
+    """
+    posicao = {dezena: i + 1 for i, dezena in enumerate(sorted(int(n) for n in base))}
+    return [[posicao[int(d)] for d in jogo] for jogo in jogos]
+
+
+def listar_designs() -> list[tuple]:
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    linhas = conn.execute(
+        "SELECT v, k, t, m, qtd_jogos FROM biblioteca_coberturas ORDER BY m, k, v, t"
+    ).fetchall()
+    conn.close()
+
+    return linhas
@@ -0,0 +1,137 @@
+# core/cache_backtest.py
+import sqlite3
+import numpy as np
+from collections import OrderedDict
+from config import DB_PATH
+
+
+# --------------------------------------------------
+# CACHE DE BACKTEST (MEMÓRIA + SQLITE)
+# --------------------------------------------------
+# Chave: (loteria, jogo ordenado). Cada entrada guarda a versão do
+# histórico (último concurso) e a distribuição de acertos do jogo.
+# Entradas de versões anteriores são devolvidas com a sua versão para
+# que o motor aplique apenas os concursos novos (atualização incremental).
+CAPACIDADE_MEMORIA = 50_000
+LOTE_SQLITE = 500
+
+_memoria = OrderedDict()
+
+
+def chave_jogo(jogo) -> str:
+    return ",".join(str(int(d)) for d in sorted(jogo))
+
+
+def _criar_tabela(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_backtest (
+            loteria TEXT NOT NULL,
+            jogo TEXT NOT NULL,
+            versao INTEGER NOT NULL,
+            distribuicao TEXT NOT NULL,
+            atualizado_em DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (loteria, jogo)
+        )
+    """)
+
+
+def _guardar_memoria(loteria: str, chave: str, versao: int, distribuicao: np.ndarray):
+    _memoria[(loteria, chave)] = (versao, distribuicao)
+    _memoria.move_to_end((loteria, chave))
+
+    while len(_memoria) > CAPACIDADE_MEMORIA:
+        _memoria.popitem(last=False)
+
+
+def _ler_distribuicao(texto: str) -> np.ndarray:
+    return np.array(texto.split(","), dtype=np.int64)
+
+
+def buscar(loteria: str, chaves: list[str], versao: int) -> dict:
+    """
+    Retorna {chave: (versao_entrada, distribuicao)} para as chaves em cache
+    com versão até a atual. Procura primeiro na memória e depois no SQLite.
+    """
+    encontrados = {}
+    pendentes = []
+
+    for chave in chaves:
+        entrada = _memoria.get((loteria, chave))
+        if entrada and entrada[0] == versao:
+            _memoria.move_to_end((loteria, chave))
+            encontrados[chave] = entrada
+        else:
+            pendentes.append(chave)
+
+    if not pendentes:
+        return encontrados
+
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+
+    for i in range(0, len(pendentes), LOTE_SQLITE):
+        lote = pendentes[i:i + LOTE_SQLITE]
+        marcadores = ", ".join("?" * len(lote))
+        linhas = conn.execute(
+            f"SELECT jogo, versao, distribuicao FROM cache_backtest "
+            f"WHERE loteria = ? AND versao <= ? AND jogo IN ({marcadores})",
+            (loteria, versao, *lote)
+        ).fetchall()
+
+        for chave, versao_entrada, texto in linhas:
+            distribuicao = _ler_distribuicao(texto)
+            encontrados[chave] = (versao_entrada, distribuicao)
+            if versao_entrada == versao:
+                _guardar_memoria(loteria, chave, versao, distribuicao)
+
+    conn.close()
+
+    return encontrados
+
+
+def listar_desatualizadas(loteria: str, versao: int, limite: int = 5_000) -> dict:
+    """
+    Retorna até `limite` entradas do SQLite com versão anterior à atual,
+    no mesmo formato de buscar().
+    """
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    linhas = conn.execute("""
+        SELECT jogo, versao, distribuicao FROM cache_backtest
+        WHERE loteria = ? AND versao < ?
+        LIMIT ?
+    """, (loteria, versao, limite)).fetchall()
+    conn.close()
+
+    return {
+        chave: (versao_entrada, _ler_distribuicao(texto))
+        for chave, versao_entrada, texto in linhas
+    }
+
+
+def salvar(loteria: str, distribuicoes: dict, versao: int):
+    """
+    Grava {chave: distribuicao} na memória e no SQLite.
+    """
+    if not distribuicoes:
+        return
+
+    for chave, distribuicao in distribuicoes.items():
+        _guardar_memoria(loteria, chave, versao, distribuicao)
+
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    conn.executemany("""
+        INSERT INTO cache_backtest (loteria, jogo, versao, distribuicao, atualizado_em)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(loteria, jogo)
+        DO UPDATE SET
+            versao = excluded.versao,
+            distribuicao = excluded.distribuicao,
+            atualizado_em = CURRENT_TIMESTAMP
+    """, [
+        (loteria, chave, versao, ",".join(map(str, distribuicao.tolist())))
+        for chave, distribuicao in distribuicoes.items()
+    ])
+    conn.commit()
+    conn.close()
@@ -0,0 +1,111 @@
+# core/cache_fechamentos.py
+import json
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from config import DB_PATH
+
+
+# --------------------------------------------------
+# CACHE DE FECHAMENTOS (MEMÓRIA + SQLITE)
+# --------------------------------------------------
+# Chave: hash dos parâmetros que definem o resultado (loteria, base,
+# dezenas por jogo, alvo, orçamento, filtros, preço, versão do histórico,
+# modo de seleção, fechamento da biblioteca usado) mais a semente. Pedidos idênticos de usuários diferentes caem na mesma
+# entrada, e a semente gravada no log reabre exatamente os mesmos jogos.
+CAPACIDADE_MEMORIA = 2_000
+
+_memoria = OrderedDict()
+
+
+def _criar_tabela(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_fechamentos (
+            chave TEXT PRIMARY KEY,
+            loteria TEXT NOT NULL,
+            semente INTEGER NOT NULL,
+            jogos TEXT NOT NULL,
+            estatisticas TEXT NOT NULL,
+            criado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _hash(parametros: dict) -> str:
+    texto = json.dumps(parametros, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def parametros_fechamento(loteria, numeros_base, dezenas_por_jogo, minimo_acertos,
+                          orcamento, filtros, valor_jogo, versao_historico,
+                          modo="cobertura", design=None) -> dict:
+    return {
+        "loteria": loteria,
+        "base": sorted({int(n) for n in numeros_base}),
+        "dezenas_por_jogo": int(dezenas_por_jogo),
+        "minimo_acertos": int(minimo_acertos),
+        "orcamento": float(orcamento) if orcamento else None,
+        "filtros": {nome: list(map(int, faixa)) for nome, faixa in (filtros or {}).items()},
+        "valor_jogo": float(valor_jogo),
+        "versao_historico": int(versao_historico),
+        "modo": modo,
+        "design": design,
+    }
+
+
+def semente_padrao(parametros: dict) -> int:
+    """Semente derivada dos próprios parâmetros (31 bits)."""
+    return int(_hash(parametros)[:8], 16) & 0x7FFFFFFF
+
+
+def chave_fechamento(parametros: dict, semente: int) -> str:
+    return _hash({**parametros, "semente": int(semente)})
+
+
+def _guardar_memoria(chave: str, resultado: dict):
+    _memoria[chave] = resultado
+    _memoria.move_to_end(chave)
+
+    while len(_memoria) > CAPACIDADE_MEMORIA:
+        _memoria.popitem(last=False)
+
+
+def buscar(chave: str) -> dict | None:
+    """
+    {"jogos": [...], "estatisticas": {...}} ou None.
+    Procura primeiro na memória e depois no SQLite.
+    """
+    if chave in _memoria:
+        _memoria.move_to_end(chave)
+        return _memoria[chave]
+
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    row = conn.execute(
+        "SELECT jogos, estatisticas FROM cache_fechamentos WHERE chave = ?", (chave,)
+    ).fetchone()
+    conn.close()
+
+    if not row:
+        return None
+
+    resultado = {"jogos": json.loads(row[0]), "estatisticas": json.loads(row[1])}
+    _guardar_memoria(chave, resultado)
+
+    return resultado
+
+
+def salvar(chave: str, loteria: str, semente: int, resultado: dict):
+    jogos = [[int(d) for d in jogo] for jogo in resultado["jogos"]]
+    estatisticas = resultado["estatisticas"]
+
+    conn = sqlite3.connect(DB_PATH)
+    _criar_tabela(conn)
+    conn.execute("""
+        INSERT OR REPLACE INTO cache_fechamentos (chave, loteria, semente, jogos, estatisticas, criado_em)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """, (chave, loteria, int(semente), json.dumps(jogos), json.dumps(estatisticas)))
+    conn.commit()
+    conn.close()
+
+    _guardar_memoria(chave, {"jogos": jogos, "estatisticas": estatisticas})
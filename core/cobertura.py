@@ -0,0 +1,691 @@
+# core/cobertura.py
+import os
+import math
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from core.combinatoria import binomial, mascaras_combinacoes, ranks_para_mascaras
+from core.mascaras import codificar, decodificar, popcount
+from core import biblioteca_coberturas
+from core.gerador import sortear_distintos
+
+
+# --------------------------------------------------
+# FECHAMENTO POR COBERTURA (SET COVER GULOSO)
+# --------------------------------------------------
+# Sorteios: todas as combinações de `sorteadas` dezenas da base.
+# Candidatos: todas as combinações de `dezenas_por_jogo` dezenas da base.
+# Um jogo cobre um sorteio quando acerta pelo menos `minimo_acertos`.
+# A cada passo entra o candidato que cobre mais sorteios ainda
+# descobertos, até cobrir todos ou atingir o limite de jogos.
+#
+# Tudo roda em "espaço local": o bit i representa base[i]. Assim as
+# combinações saem de mascaras_combinacoes(len(base), k) e só no fim
+# são traduzidas para as dezenas reais.
+LIMITE_SORTEIOS = 200_000
+LIMITE_CANDIDATOS = 200_000
+
+# candidatos reavaliados por passo (os de maior ganho estimado)
+AMOSTRA_POR_PASSO = 256
+CELULAS_POR_BLOCO = 4_000_000
+# Limites de trabalho, não de relógio: mesma semente -> mesmos jogos em
+# qualquer máquina. Guloso: células (candidato x sorteio) avaliadas;
+# ~1,8 bilhão por segundo medido, ou seja, ~20 s.
+LIMITE_CELULAS_GULOSO = 36_000_000_000
+
+# busca local que tenta manter a garantia com menos jogos: sempre
+# BUSCAS_OTIMIZACAO buscas (sementes fixas), cada uma com até
+# TROCAS_OTIMIZACAO trocas e até CELULAS_OTIMIZACAO / BUSCAS_OTIMIZACAO
+# de trabalho. Trabalho em células (sorteios percorridos): uma troca
+# custa sorteios + CUSTO_FIXO_TROCA e tirar um jogo custa jogos x
+# sorteios. Medido em um núcleo: troca = ~35 µs + ~1,37 ns por sorteio
+# (base 21/alvo 13: 9 mil trocas/s; base 22/alvo 13: 3,7 mil/s), ou seja,
+# ~8 s somando as buscas em um núcleo (~2 s com 4 workers) em qualquer
+# base, e a mesma semente dá os mesmos jogos em qualquer máquina.
+BUSCAS_OTIMIZACAO = 4
+TROCAS_OTIMIZACAO = 100_000
+CELULAS_OTIMIZACAO = 6_000_000_000
+CUSTO_FIXO_TROCA = 25_000
+TEMPERATURA_INICIAL = 1.0
+RESFRIAMENTO = 0.999
+TEMPERATURA_MINIMA = 0.05
+# para antes do tempo: trocas seguidas sem achar cobertura menor (nas
+# medições as melhoras vieram a menos de 30 mil trocas da anterior)
+SEM_MELHORA = 30_000
+PROCESSOS_OTIMIZACAO = 4  # workers do pool compartilhado (não muda o resultado)
+
+# verificação exata da garantia: limite de células (sorteios x jogos)
+LIMITE_VERIFICACAO = 2_000_000_000
+SORTEIOS_POR_FATIA = 1_000_000
+
+
+# Pool de processos único por processo do bot (criado na primeira busca,
+# com spawn: seguro a partir das threads do asyncio.to_thread).
+_pool = {"executor": None}
+_trava_pool = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor:
+    with _trava_pool:
+        if _pool["executor"] is None:
+            _pool["executor"] = ProcessPoolExecutor(
+                max_workers=PROCESSOS_OTIMIZACAO,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool["executor"]
+
+
+def _executar(funcao, chamadas: list[tuple], processos: int) -> list:
+    """
+    funcao(*args) para cada args de chamadas, na ordem. Usa o pool
+    compartilhado quando processos >= 2; pool quebrado é descartado e a
+    conta é refeita aqui.
+    """
+    if processos >= 2 and len(chamadas) >= 2:
+        try:
+            futuros = [_executor().submit(funcao, *args) for args in chamadas]
+            return [f.result() for f in futuros]
+        except BrokenProcessPool:
+            with _trava_pool:
+                _pool["executor"] = None
+
+    return [funcao(*args) for args in chamadas]
+
+
+def cabe_na_memoria(tamanho_base: int, dezenas_por_jogo: int, sorteadas: int) -> bool:
+    return (
+        binomial(tamanho_base, sorteadas) <= LIMITE_SORTEIOS
+        and binomial(tamanho_base, dezenas_por_jogo) <= LIMITE_CANDIDATOS
+    )
+
+
+def local_para_real(mascaras_locais: np.ndarray, base) -> np.ndarray:
+    """
+    Traduz máscaras do espaço local (bit i = base[i]) para dezenas reais.
+    """
+    mascaras_locais = mascaras_locais.astype(np.uint64)
+    reais = np.zeros(len(mascaras_locais), dtype=np.uint64)
+
+    for i, dezena in enumerate(base):
+        bit = (mascaras_locais >> np.uint64(i)) & np.uint64(1)
+        reais |= bit << np.uint64(dezena - 1)
+
+    return reais
+
+
+def real_para_local(jogos, base) -> np.ndarray:
+    posicao = {dezena: i for i, dezena in enumerate(base)}
+    return np.array(
+        [sum(1 << posicao[int(d)] for d in jogo) for jogo in jogos],
+        dtype=np.uint64,
+    )
+
+
+def contar_cobertos(jogo: np.ndarray, sorteios: np.ndarray, minimo_acertos: int) -> np.ndarray:
+    return popcount(jogo & sorteios) >= minimo_acertos
+
+
+def _ganhos(candidatos: np.ndarray, descobertos: np.ndarray, minimo_acertos: int) -> np.ndarray:
+    ganhos = np.zeros(len(candidatos), dtype=np.int64)
+    passo = max(1, CELULAS_POR_BLOCO // max(1, len(descobertos)))
+
+    for inicio in range(0, len(candidatos), passo):
+        bloco = candidatos[inicio:inicio + passo]
+        acertos = popcount(bloco[:, None] & descobertos[None, :])
+        ganhos[inicio:inicio + passo] = (acertos >= minimo_acertos).sum(axis=1)
+
+    return ganhos
+
+
+def gerar_cobertura(
+    numeros_base,
+    dezenas_por_jogo: int,
+    sorteadas: int,
+    minimo_acertos: int,
+    max_jogos: int,
+    filtro=None,
+    rng: np.random.Generator | None = None,
+) -> dict | None:
+    """
+    Escolhe até max_jogos jogos que garantem minimo_acertos para o maior
+    número possível de sorteios com todas as dezenas dentro da base.
+
+    filtro: função opcional que recebe máscaras reais e devolve um array
+    booleano com os candidatos permitidos.
+
+    Retorna None quando o espaço da base é grande demais para a busca
+    exata; caso contrário:
+        jogos          : lista de jogos (dezenas reais, ordenadas)
+        sorteios_total : C(base, sorteadas)
+        cobertos       : sorteios que terão pelo menos minimo_acertos
+        interrompido   : True se a busca parou no LIMITE_CELULAS_GULOSO
+    """
+    base = sorted({int(n) for n in numeros_base})
+    v = len(base)
+
+    if v < max(dezenas_por_jogo, sorteadas) or minimo_acertos > min(dezenas_por_jogo, sorteadas):
+        return None
+
+    if not cabe_na_memoria(v, dezenas_por_jogo, sorteadas):
+        return None
+
+    rng = rng or np.random.default_rng()
+    dtype = np.uint32 if v <= 32 else np.uint64
+
+    sorteios = mascaras_combinacoes(v, sorteadas, dtype)
+    if dezenas_por_jogo == sorteadas:
+        candidatos = sorteios.copy()
+    else:
+        candidatos = mascaras_combinacoes(v, dezenas_por_jogo, dtype)
+
+    if filtro is not None:
+        candidatos = candidatos[filtro(local_para_real(candidatos, base))]
+
+    if not len(candidatos):
+        return None
+
+    # antes de qualquer escolha todo candidato cobre o mesmo número de sorteios
+    ganho_inicial = sum(
+        binomial(dezenas_por_jogo, h) * binomial(v - dezenas_por_jogo, sorteadas - h)
+        for h in range(minimo_acertos, min(dezenas_por_jogo, sorteadas) + 1)
+    )
+    estimativa = np.full(len(candidatos), ganho_inicial, dtype=np.float64)
+
+    descobertos = sorteios
+    escolhidos = []
+    celulas = 0
+    interrompido = False
+
+    while len(escolhidos) < max_jogos and len(descobertos):
+        if celulas > LIMITE_CELULAS_GULOSO:
+            interrompido = True
+            break
+
+        # ganhos só diminuem: reavalia os de maior estimativa
+        # (ruído < 1 apenas desempata ao acaso)
+        qtd = min(AMOSTRA_POR_PASSO, len(candidatos))
+        prioridade = estimativa + rng.random(len(candidatos))
+        lote = np.argpartition(-prioridade, qtd - 1)[:qtd]
+
+        ganhos = _ganhos(candidatos[lote], descobertos, minimo_acertos)
+        estimativa[lote] = ganhos
+        celulas += len(lote) * len(descobertos)
+
+        if ganhos.max() <= 0:
+            break
+
+        melhor = lote[int(np.argmax(ganhos))]
+        escolhidos.append(melhor)
+        estimativa[melhor] = -1
+
+        descobertos = descobertos[~contar_cobertos(candidatos[melhor], descobertos, minimo_acertos)]
+
+    jogos_reais = local_para_real(candidatos[np.array(escolhidos, dtype=np.int64)], base)
+
+    return {
+        "jogos": [decodificar(m) for m in jogos_reais],
+        "sorteios_total": len(sorteios),
+        "cobertos": len(sorteios) - len(descobertos),
+        "interrompido": interrompido,
+    }
+
+
+# --------------------------------------------------
+# OTIMIZAÇÃO LOCAL (SIMULATED ANNEALING)
+# --------------------------------------------------
+# Parte de uma cobertura completa, tira o jogo menos útil e troca jogos
+# até voltar a cobrir todos os sorteios. Conseguindo, repete com um jogo
+# a menos. Cada troca coloca um vizinho de um sorteio descoberto (jogo
+# que o cobre) no lugar de um jogo sorteado ao acaso; pioras são aceitas
+# com probabilidade exp(-delta / T). Para após `trocas` trocas, ao gastar
+# as `celulas` de trabalho, após SEM_MELHORA trocas sem progresso ou ao
+# atingir o limite inferior ceil(sorteios / sorteios cobertos por um jogo).
+def _vizinho(sorteio: int, v: int, dezenas_por_jogo: int, minimo_acertos: int,
+             rng: np.random.Generator) -> int:
+    """Jogo local aleatório que acerta pelo menos minimo_acertos do sorteio."""
+    dentro = [i for i in range(v) if sorteio >> i & 1]
+    mantidas = rng.choice(dentro, minimo_acertos, replace=False)
+
+    resto = np.setdiff1d(np.arange(v), mantidas)
+    extras = rng.choice(resto, dezenas_por_jogo - minimo_acertos, replace=False)
+
+    return sum(1 << int(i) for i in np.concatenate([mantidas, extras]))
+
+
+def _sem_o_menos_util(jogos: np.ndarray, sorteios: np.ndarray, contagem: np.ndarray,
+                      minimo_acertos: int):
+    # jogo que cobre sozinho o menor número de sorteios
+    exclusivos = [
+        int((contar_cobertos(jogo, sorteios, minimo_acertos) & (contagem == 1)).sum())
+        for jogo in jogos
+    ]
+    i = int(np.argmin(exclusivos))
+    contagem = contagem - contar_cobertos(jogos[i], sorteios, minimo_acertos)
+
+    return np.delete(jogos, i), contagem
+
+
+def limite_inferior(v: int, dezenas_por_jogo: int, sorteadas: int, minimo_acertos: int) -> int:
+    """Nenhuma cobertura completa tem menos jogos que isto."""
+    por_jogo = sum(
+        binomial(dezenas_por_jogo, h) * binomial(v - dezenas_por_jogo, sorteadas - h)
+        for h in range(minimo_acertos, min(dezenas_por_jogo, sorteadas) + 1)
+    )
+    return -(-binomial(v, sorteadas) // max(1, por_jogo))
+
+
+def _reduzir_cobertura(v: int, dezenas_por_jogo: int, sorteadas: int, minimo_acertos: int,
+                       jogos_locais: np.ndarray, base, filtro, trocas: int,
+                       celulas: int | None, semente: int) -> np.ndarray:
+    piso = limite_inferior(v, dezenas_por_jogo, sorteadas, minimo_acertos)
+    rng = np.random.default_rng(semente)
+    dtype = np.uint32 if v <= 32 else np.uint64
+
+    sorteios = mascaras_combinacoes(v, sorteadas, dtype)
+    melhor = jogos_locais.astype(dtype)
+
+    contagem = np.zeros(len(sorteios), dtype=np.int32)
+    for jogo in melhor:
+        contagem += contar_cobertos(jogo, sorteios, minimo_acertos)
+
+    if len(melhor) <= piso:
+        return melhor
+
+    atual, contagem = _sem_o_menos_util(melhor, sorteios, contagem, minimo_acertos)
+    trabalho = 2 * len(melhor) * len(sorteios)
+    celulas = math.inf if celulas is None else celulas
+    temperatura = TEMPERATURA_INICIAL
+    sem_melhora = 0
+
+    for _ in range(trocas):
+        if not len(atual) or sem_melhora >= SEM_MELHORA or trabalho > celulas:
+            break
+        sem_melhora += 1
+        trabalho += len(sorteios) + CUSTO_FIXO_TROCA
+        descobertos = np.flatnonzero(contagem == 0)
+
+        if not len(descobertos):
+            melhor = atual.copy()
+            sem_melhora = 0
+            if len(melhor) <= piso:
+                break
+            atual, contagem = _sem_o_menos_util(atual, sorteios, contagem, minimo_acertos)
+            trabalho += len(atual) * len(sorteios)
+            temperatura = TEMPERATURA_INICIAL
+            continue
+
+        alvo = int(sorteios[rng.choice(descobertos)])
+        novo = dtype(_vizinho(alvo, v, dezenas_por_jogo, minimo_acertos, rng))
+        if filtro is not None and not filtro(local_para_real(np.array([novo]), base))[0]:
+            continue
+
+        i = int(rng.integers(len(atual)))
+        nova_contagem = (
+            contagem
+            - contar_cobertos(atual[i], sorteios, minimo_acertos)
+            + contar_cobertos(novo, sorteios, minimo_acertos)
+        )
+        delta = int((nova_contagem == 0).sum()) - len(descobertos)
+
+        if delta <= 0 or rng.random() < math.exp(-delta / temperatura):
+            atual[i] = novo
+            contagem = nova_contagem
+
+        temperatura = max(TEMPERATURA_MINIMA, temperatura * RESFRIAMENTO)
+
+    return melhor
+
+
+def otimizar_cobertura(
+    numeros_base,
+    jogos,
+    dezenas_por_jogo: int,
+    sorteadas: int,
+    minimo_acertos: int,
+    trocas: int = TROCAS_OTIMIZACAO,
+    filtro=None,
+    processos: int | None = None,
+    semente: int | None = None,
+    celulas: int | None = CELULAS_OTIMIZACAO,
+) -> list[list[int]]:
+    """
+    Tenta manter a garantia de uma cobertura completa com menos jogos.
+    Roda BUSCAS_OTIMIZACAO buscas (sementes derivadas de `semente`), até
+    `trocas` trocas e celulas / BUSCAS_OTIMIZACAO de trabalho cada (None:
+    sem limite, uso offline), no pool compartilhado, e devolve a menor
+    cobertura encontrada, ou os próprios jogos se nenhuma busca melhorou.
+    O resultado só depende da semente.
+    """
+    base = sorted({int(n) for n in numeros_base})
+    v = len(base)
+
+    if len(jogos) < 2 or not cabe_na_memoria(v, dezenas_por_jogo, sorteadas):
+        return [list(j) for j in jogos]
+
+    jogos_locais = real_para_local(jogos, base)
+    processos = min(processos or os.cpu_count() or 1, PROCESSOS_OTIMIZACAO)
+    sementes = np.random.SeedSequence(semente).generate_state(BUSCAS_OTIMIZACAO).tolist()
+    por_busca = None if celulas is None else celulas // BUSCAS_OTIMIZACAO
+    argumentos = (v, dezenas_por_jogo, sorteadas, minimo_acertos, jogos_locais, base, filtro, trocas, por_busca)
+
+    resultados = _executar(_reduzir_cobertura, [(*argumentos, s) for s in sementes], processos)
+
+    # uma troca pode repetir um jogo: cópias não acrescentam cobertura
+    melhor = min((np.unique(r) for r in resultados), key=len)
+    if len(melhor) >= len(jogos):
+        return [list(j) for j in jogos]
+
+    return [decodificar(m) for m in local_para_real(melhor, base)]
+
+
+# --------------------------------------------------
+# VERIFICAÇÃO DA GARANTIA
+# --------------------------------------------------
+# Percorre TODOS os sorteios possíveis dentro da base (ranks colex
+# 0 .. C(v, sorteadas) - 1, desranqueados em blocos) e anota o melhor
+# acerto do conjunto de jogos em cada um. Memória limitada pelo bloco;
+# faixas de ranks grandes são divididas entre processos.
+def _histograma_melhores(jogos_locais: np.ndarray, sorteadas: int,
+                         inicio: int, fim: int) -> np.ndarray:
+    histograma = np.zeros(sorteadas + 1, dtype=np.int64)
+    passo = max(1, CELULAS_POR_BLOCO // len(jogos_locais))
+
+    for a in range(inicio, fim, passo):
+        ranks = np.arange(a, min(a + passo, fim), dtype=np.uint64)
+        sorteios = ranks_para_mascaras(ranks, sorteadas)
+        melhor = popcount(sorteios[:, None] & jogos_locais[None, :]).max(axis=1)
+        histograma += np.bincount(melhor, minlength=sorteadas + 1)[:sorteadas + 1]
+
+    return histograma
+
+
+def verificar_garantia(
+    jogos,
+    numeros_base,
+    sorteadas: int,
+    minimo_acertos: int,
+    processos: int | None = None,
+) -> dict | None:
+    """
+    Confere, sorteio a sorteio, a garantia de um conjunto de jogos sobre
+    todos os C(base, sorteadas) resultados possíveis dentro da base.
+
+    Retorna None se o espaço for grande demais (LIMITE_VERIFICACAO);
+    caso contrário:
+        sorteios_total   : C(base, sorteadas)
+        cobertos         : sorteios com pelo menos minimo_acertos
+        fracao           : cobertos / sorteios_total
+        minimo_garantido : menor "melhor acerto" entre todos os sorteios
+        distribuicao     : sorteios por melhor acerto (0..sorteadas)
+    """
+    base = sorted({int(n) for n in numeros_base})
+    total = binomial(len(base), sorteadas)
+
+    if not total or not len(jogos) or total * len(jogos) > LIMITE_VERIFICACAO:
+        return None
+
+    # dezenas fora da base nunca acertam um sorteio dentro dela
+    posicao = {dezena: i for i, dezena in enumerate(base)}
+    jogos_locais = np.array(
+        [sum(1 << posicao[int(d)] for d in jogo if int(d) in posicao) for jogo in jogos],
+        dtype=np.uint64,
+    )
+
+    fatias = [(a, min(a + SORTEIOS_POR_FATIA, total)) for a in range(0, total, SORTEIOS_POR_FATIA)]
+    processos = processos or os.cpu_count() or 1
+
+    histograma = sum(_executar(
+        _histograma_melhores, [(jogos_locais, sorteadas, a, b) for a, b in fatias], processos
+    ))
+
+    cobertos = int(histograma[minimo_acertos:].sum())
+
+    return {
+        "sorteios_total": total,
+        "cobertos": cobertos,
+        "fracao": cobertos / total,
+        "minimo_garantido": int(np.flatnonzero(histograma)[0]),
+        "distribuicao": histograma.tolist(),
+    }
+
+
+# --------------------------------------------------
+# FECHAMENTO DA BASE (BIBLIOTECA -> GULOSO -> OTIMIZAÇÃO)
+# --------------------------------------------------
+def completar_jogos(jogos, base, dezenas_por_jogo: int, qtd: int,
+                    rng: np.random.Generator, filtro=None) -> list[list[int]]:
+    """
+    Completa jogos até qtd com jogos distintos aleatórios (sem repetir):
+    os já escolhidos saem do sorteio antes do corte em qtd.
+    """
+    jogos = [list(jogo) for jogo in jogos]
+    if len(jogos) >= qtd:
+        return jogos
+
+    novos = sortear_distintos(base, dezenas_por_jogo, qtd - len(jogos), rng, filtro, excluir=jogos)
+    return jogos + novos.tolist()
+
+
+# design: id do fechamento da biblioteca (biblioteca_versoes) ou SEM_DESIGN
+# para calcular. Entra nos parâmetros do cache e no log: a mesma semente
+# com o mesmo design reproduz os mesmos jogos.
+SEM_DESIGN = "nenhum"
+
+
+def escolher_design(numeros_base, dezenas_por_jogo: int, sorteadas: int,
+                    minimo_acertos: int, max_jogos: int, filtro=None) -> str:
+    """Id do fechamento da biblioteca que cabe em max_jogos e passa no filtro."""
+    base = sorted({int(n) for n in numeros_base})
+    chave = (len(base), dezenas_por_jogo, minimo_acertos, sorteadas)
+
+    ranks = biblioteca_coberturas.buscar_design(*chave)
+    if ranks is None or len(ranks) > max_jogos:
+        return SEM_DESIGN
+
+    jogos = biblioteca_coberturas.aplicar_design(ranks, dezenas_por_jogo, base)
+    if filtro is not None and not filtro(codificar(jogos)).all():
+        return SEM_DESIGN
+
+    return biblioteca_coberturas.id_design(*chave, ranks)
+
+
+def fechar_base(
+    numeros_base,
+    dezenas_por_jogo: int,
+    sorteadas: int,
+    minimo_acertos: int,
+    max_jogos: int,
+    filtro=None,
+    semente: int | None = None,
+    design: str | None = None,
+) -> dict | None:
+    """
+    Usa o fechamento da biblioteca quando existe um que caiba em max_jogos
+    (e passe no filtro); senão calcula com o guloso e, se a cobertura
+    ficou completa, reduz com a busca local e guarda na biblioteca.
+    design: None escolhe pela biblioteca atual (escolher_design); um id
+    reabre aquele fechamento; SEM_DESIGN calcula.
+
+    Retorna None quando nada pôde ser calculado; caso contrário:
+        jogos        : lista de jogos (dezenas reais)
+        cobertura    : fração dos sorteios da base com a garantia (pelos
+                       jogos do guloso: piso, se houve complemento)
+        economizados : jogos removidos pela otimização
+        origem       : "biblioteca" ou "calculado"
+        interrompido : o guloso parou no limite de trabalho
+        completados  : jogos aleatórios que completaram o orçamento
+                       (cobertura incompleta)
+        design       : id do fechamento da biblioteca ou SEM_DESIGN
+    """
+    base = sorted({int(n) for n in numeros_base})
+    v = len(base)
+
+    if design is None:
+        design = escolher_design(base, dezenas_por_jogo, sorteadas, minimo_acertos, max_jogos, filtro)
+
+    if design != SEM_DESIGN:
+        versao = biblioteca_coberturas.buscar_versao(design)
+        if versao is None or versao[0] != (v, dezenas_por_jogo, minimo_acertos, sorteadas):
+            raise ValueError(f"Fechamento {design} não existe para esta base.")
+
+        return {
+            "jogos": biblioteca_coberturas.aplicar_design(versao[1], dezenas_por_jogo, base),
+            "cobertura": 1.0, "economizados": 0, "origem": "biblioteca",
+            "interrompido": False, "completados": 0, "design": design,
+        }
+
+    rng = np.random.default_rng(semente)
+    cobertura = gerar_cobertura(
+        base, dezenas_por_jogo, sorteadas, minimo_acertos, max_jogos, filtro, rng=rng
+    )
+    if not cobertura or not cobertura["jogos"]:
+        return None
+
+    jogos = cobertura["jogos"]
+    completa = cobertura["cobertos"] == cobertura["sorteios_total"]
+    completados = 0
+    economizados = 0
+
+    if not completa:
+        # cobertura parcial (limite ou candidatos esgotados): o resto do
+        # orçamento vira jogos distintos aleatórios
+        jogos = completar_jogos(jogos, base, dezenas_por_jogo, max_jogos, rng, filtro)
+        completados = len(jogos) - len(cobertura["jogos"])
+    else:
+        jogos = otimizar_cobertura(
+            base, jogos, dezenas_por_jogo, sorteadas, minimo_acertos,
+            filtro=filtro, semente=semente
+        )
+        economizados = len(cobertura["jogos"]) - len(jogos)
+        biblioteca_coberturas.salvar_design(
+            v, dezenas_por_jogo, minimo_acertos, sorteadas,
+            biblioteca_coberturas.para_local(jogos, base)
+        )
+
+    return {
+        "jogos": jogos,
+        "cobertura": cobertura["cobertos"] / cobertura["sorteios_total"],
+        "economizados": economizados,
+        "origem": "calculado",
+        "interrompido": cobertura["interrompido"],
+        "completados": completados,
+        "design": SEM_DESIGN,
+    }
+
+
+
+# --------------------------------------------------
+# COBERTURA COM TAMANHOS MISTURADOS (CUSTO-BENEFÍCIO)
+# --------------------------------------------------
+# Mesmo guloso, com candidatos de vários tamanhos: entra o que cobre mais
+# sorteios descobertos POR REAL (ganho / custo). Para quando tudo está
+# coberto, quando nenhum candidato acrescenta nada ou ao bater no
+# limite_custo: sobra de orçamento não vira jogo inútil.
+def cabe_misto(tamanho_base: int, tamanhos, sorteadas: int) -> bool:
+    return (
+        binomial(tamanho_base, sorteadas) <= LIMITE_SORTEIOS
+        and sum(binomial(tamanho_base, n) for n in tamanhos) <= LIMITE_CANDIDATOS
+    )
+
+
+def gerar_cobertura_ponderada(
+    numeros_base,
+    custos: dict,
+    sorteadas: int,
+    minimo_acertos: int,
+    limite_custo: int,
+    filtro=None,
+) -> dict | None:
+    """
+    custos: {dezenas_por_jogo: custo inteiro (centavos)}.
+    Determinístico (desempate com semente fixa): o resultado pode ser
+    memoizado.
+
+    Retorna None quando o espaço é grande demais; caso contrário:
+        jogos          : [(dezenas_por_jogo, máscara local, custo, novos cobertos)]
+                         na ordem de escolha
+        sorteios_total : C(base, sorteadas)
+        interrompido   : True se parou no LIMITE_CELULAS_GULOSO
+        saturada       : True se parou porque tudo foi coberto ou porque
+                         nenhum jogo, de qualquer custo, cobre algo a mais
+                         (e não por causa do limite_custo)
+    """
+    base = sorted({int(n) for n in numeros_base})
+    v = len(base)
+    tamanhos = [n for n in sorted(custos) if minimo_acertos <= n <= v]
+
+    if v < sorteadas or not tamanhos or not cabe_misto(v, tamanhos, sorteadas):
+        return None
+
+    rng = np.random.default_rng(0)
+    dtype = np.uint32 if v <= 32 else np.uint64
+    sorteios = mascaras_combinacoes(v, sorteadas, dtype)
+
+    blocos = []
+    for n in tamanhos:
+        mascaras = mascaras_combinacoes(v, n, dtype)
+        if filtro is not None:
+            mascaras = mascaras[filtro(local_para_real(mascaras, base))]
+
+        # antes de qualquer escolha todo jogo de n dezenas cobre o mesmo número de sorteios
+        ganho = sum(
+            binomial(n, h) * binomial(v - n, sorteadas - h)
+            for h in range(minimo_acertos, min(n, sorteadas) + 1)
+        )
+        blocos.append((mascaras, n, custos[n], ganho))
+
+    candidatos = np.concatenate([b[0] for b in blocos])
+    tamanho = np.concatenate([np.full(len(b[0]), b[1]) for b in blocos])
+    custo = np.concatenate([np.full(len(b[0]), b[2], dtype=np.int64) for b in blocos])
+    estimativa = np.concatenate([np.full(len(b[0]), float(b[3])) for b in blocos])
+
+    descobertos = sorteios
+    escolhidos = []
+    gasto = 0
+    celulas = 0
+    interrompido = False
+
+    while len(descobertos):
+        if celulas > LIMITE_CELULAS_GULOSO:
+            interrompido = True
+            break
+
+        # ganhos só diminuem: reavalia os de maior razão estimada
+        razao = np.where(custo <= limite_custo - gasto, estimativa / custo, -1.0)
+        qtd = min(AMOSTRA_POR_PASSO, len(candidatos))
+        if not qtd:
+            break
+        lote = np.argpartition(-(razao + 1e-9 * rng.random(len(razao))), qtd - 1)[:qtd]
+        lote = lote[razao[lote] > 0]
+        if not len(lote):
+            break
+
+        ganhos = _ganhos(candidatos[lote], descobertos, minimo_acertos)
+        estimativa[lote] = ganhos
+        celulas += len(lote) * len(descobertos)
+
+        if ganhos.max() <= 0:
+            continue
+
+        melhor = lote[int(np.argmax(ganhos / custo[lote]))]
+        escolhidos.append((int(tamanho[melhor]), int(candidatos[melhor]), int(custo[melhor]), int(estimativa[melhor])))
+        gasto += int(custo[melhor])
+        estimativa[melhor] = 0
+
+        descobertos = descobertos[~contar_cobertos(candidatos[melhor], descobertos, minimo_acertos)]
+
+    saturada = not len(descobertos)
+    if not saturada and not interrompido:
+        # parou no limite_custo: confere se algum jogo fora dele ainda cobriria algo
+        pendentes = candidatos[estimativa > 0]
+        if celulas + len(pendentes) * len(descobertos) <= LIMITE_CELULAS_GULOSO:
+            saturada = not len(pendentes) or _ganhos(pendentes, descobertos, minimo_acertos).max() <= 0
+
+    return {
+        "jogos": escolhidos,
+        "sorteios_total": len(sorteios),
+        "interrompido": interrompido,
+        "saturada": saturada,
+    }
@@ -0,0 +1,142 @@
+# core/combinatoria.py
+import numpy as np
+
+
+# --------------------------------------------------
+# COMBINAÇÕES EM ORDEM COLEX
+# --------------------------------------------------
+# Na ordem colexicográfica o rank de um jogo {c1 < c2 < ... < ck}
+# (dezenas base 0) é  C(c1, 1) + C(c2, 2) + ... + C(ck, k).
+# Essa ordem coincide com a ordem numérica das bitmasks, então
+# "todas as máscaras com k bits, em ordem crescente" = ranks 0, 1, 2, ...
+MAX_UNIVERSO = 60
+
+BINOMIAIS = np.zeros((MAX_UNIVERSO + 1, MAX_UNIVERSO + 1), dtype=np.uint64)
+for _n in range(MAX_UNIVERSO + 1):
+    BINOMIAIS[_n, 0] = 1
+    for _k in range(1, _n + 1):
+        BINOMIAIS[_n, _k] = BINOMIAIS[_n - 1, _k - 1] + BINOMIAIS[_n - 1, _k]
+
+
+def binomial(n: int, k: int) -> int:
+    if k < 0 or n < 0 or k > n:
+        return 0
+    return int(BINOMIAIS[n, k])
+
+
+def ranquear(jogos) -> np.ndarray:
+    """
+    Rank colex de cada jogo (matriz (qtd, k) ou lista de jogos de mesmo
+    tamanho, dezenas a partir de 1). Independe do tamanho do universo.
+    """
+    matriz = np.sort(np.asarray(jogos, dtype=np.int64).reshape(len(jogos), -1), axis=1) - 1
+    posicoes = np.arange(1, matriz.shape[1] + 1)
+
+    return BINOMIAIS[matriz, posicoes].sum(axis=1, dtype=np.uint64)
+
+
+def mascaras_combinacoes(n: int, k: int, dtype=np.uint64) -> np.ndarray:
+    """
+    Bitmasks de todas as combinações k de {1..n}, em ordem colex:
+    a posição i do array é a combinação de rank i.
+    """
+    # nivel[m] = combinações (j) de {0..m-1}, já em ordem crescente.
+    # As combinações j de m elementos são as que não usam m-1
+    # seguidas das que usam (todas maiores numericamente).
+    nivel = [np.zeros(1, dtype=dtype) for _ in range(n + 1)]
+
+    for j in range(1, k + 1):
+        atual = [np.zeros(0, dtype=dtype) for _ in range(n + 1)]
+        for m in range(j, n + 1):
+            atual[m] = np.concatenate([
+                atual[m - 1],
+                nivel[m - 1] | dtype(1 << (m - 1)),
+            ])
+        nivel = atual
+
+    return nivel[n]
+
+
+# --------------------------------------------------
+# RANK <-> JOGO (VETORIZADO)
+# --------------------------------------------------
+def dtype_rank(n: int, k: int):
+    """
+    Menor inteiro sem sinal que comporta os ranks de C(n, k).
+    Ex.: 15 de 25 e 6 de 60 cabem em uint32.
+    """
+    return np.uint32 if binomial(n, k) <= np.iinfo(np.uint32).max else np.uint64
+
+
+def desranquear(ranks, k: int) -> np.ndarray:
+    """
+    Inverso do ranquear: matriz (qtd, k) de dezenas (a partir de 1),
+    em ordem crescente.
+    """
+    restante = np.asarray(ranks, dtype=np.uint64).copy()
+    jogos = np.empty((len(restante), k), dtype=np.uint8)
+
+    for posicao in range(k, 0, -1):
+        # maior c com C(c, posicao) <= restante
+        coluna = BINOMIAIS[:, posicao]
+        c = np.searchsorted(coluna, restante, side="right") - 1
+        restante -= coluna[c]
+        jogos[:, posicao - 1] = c + 1
+
+    return jogos
+
+
+def ranks_para_mascaras(ranks, k: int, dtype=np.uint64) -> np.ndarray:
+    """
+    Bitmask de cada jogo dado pelo rank.
+    """
+    jogos = desranquear(ranks, k).astype(np.uint64) - 1
+    bits = np.left_shift(np.uint64(1), jogos)
+
+    return np.bitwise_or.reduce(bits, axis=1).astype(dtype)
+
+
+# --------------------------------------------------
+# REPRESENTAÇÃO COMPACTA DE UM CONJUNTO DE JOGOS
+# --------------------------------------------------
+# {"ranks": rank de cada jogo, "tamanhos": dezenas de cada jogo}
+# Mantém a ordem original e aceita jogos de tamanhos diferentes.
+def compactar_jogos(jogos) -> dict:
+    tamanhos = np.array([len(j) for j in jogos], dtype=np.uint8)
+    ranks = np.zeros(len(jogos), dtype=np.uint64)
+
+    for tamanho in np.unique(tamanhos):
+        posicoes = np.flatnonzero(tamanhos == tamanho)
+        ranks[posicoes] = ranquear([jogos[i] for i in posicoes])
+
+    if len(ranks) and ranks.max() <= np.iinfo(np.uint32).max:
+        ranks = ranks.astype(np.uint32)
+
+    return {"ranks": ranks, "tamanhos": tamanhos}
+
+
+def expandir_jogos(compactos: dict) -> list[list[int]]:
+    ranks = compactos["ranks"]
+    tamanhos = compactos["tamanhos"]
+    jogos = [None] * len(ranks)
+
+    for tamanho in np.unique(tamanhos):
+        posicoes = np.flatnonzero(tamanhos == tamanho)
+        for i, jogo in zip(posicoes, desranquear(ranks[posicoes], int(tamanho)).tolist()):
+            jogos[i] = jogo
+
+    return jogos
+
+
+def remover_duplicados(compactos: dict) -> dict:
+    """
+    Remove jogos repetidos mantendo a primeira ocorrência de cada um.
+    """
+    chaves = compactos["ranks"].astype(np.uint64) * np.uint64(64) + compactos["tamanhos"]
+    _, primeiros = np.unique(chaves, return_index=True)
+    primeiros.sort()
+
+    return {
+        "ranks": compactos["ranks"][primeiros],
+        "tamanhos": compactos["tamanhos"][primeiros],
+    }
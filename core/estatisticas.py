@@ -0,0 +1,116 @@
+# core/estatisticas.py
+import numpy as np
+from core import indice
+
+
+# --------------------------------------------------
+# ESTATÍSTICAS SOBRE O ÍNDICE INVERTIDO
+# --------------------------------------------------
+# Tudo sai do índice dezena -> concursos (core.indice), derivado do
+# snapshot do histórico: não há tabela própria para atualizar. Arrays int64
+# indexados pela própria dezena (posição 0 sem uso):
+#   frequencia    (U+1,)          vezes que a dezena saiu
+#   atraso        (U+1,)          concursos desde a última vez que saiu
+#   atraso_maximo (U+1,)          maior atraso já observado
+#   pares         (U+1, U+1)      pares[a, b] (a < b) saíram juntos
+#   trios         (U+1, U+1, U+1) trios[a, b, c] (a < b < c) saíram juntos
+# O resultado fica em memória até o índice ganhar concursos novos.
+_cache = {}
+
+
+def _atraso_maximo(incidencia: np.ndarray) -> np.ndarray:
+    """Maior sequência de concursos sem a dezena (inclui a atual)."""
+    qtd = incidencia.shape[1]
+    maximo = np.empty(len(incidencia), dtype=np.int64)
+
+    for dezena, linha in enumerate(incidencia):
+        saidas = np.concatenate([[-1], np.flatnonzero(linha), [qtd]])
+        maximo[dezena] = (np.diff(saidas) - 1).max()
+
+    return maximo
+
+
+def _trios(incidencia: np.ndarray) -> np.ndarray:
+    """trios[a, b, c] com a < b < c; um produto de matrizes por dezena a."""
+    n = len(incidencia)
+    matriz = incidencia.astype(np.float32)
+    trios = np.zeros((n, n, n), dtype=np.int64)
+
+    for a in range(1, n):
+        trios[a] = np.rint((matriz[a] * matriz) @ matriz.T)
+
+    a, b, c = np.ogrid[:n, :n, :n]
+    trios[~((a < b) & (b < c))] = 0
+
+    return trios
+
+
+def carregar_estatisticas(loteria: str) -> dict:
+    """
+    Estatísticas derivadas do índice; só recalcula quando o índice tem
+    concursos novos.
+    """
+    idx = indice.carregar_indice(loteria)
+
+    em_cache = _cache.get(loteria)
+    if em_cache and em_cache["ultimo_concurso"] == idx["ultimo_concurso"]:
+        return em_cache
+
+    incidencia = idx["incidencia"]
+    estatisticas = {
+        "qtd_concursos": idx["qtd_concursos"],
+        "ultimo_concurso": idx["ultimo_concurso"],
+        "frequencia": indice.frequencias(idx),
+        "atraso": indice.atrasos(idx),
+        "atraso_maximo": _atraso_maximo(incidencia),
+        "pares": np.triu(indice.coocorrencia(idx), k=1),
+        "trios": _trios(incidencia),
+    }
+
+    _cache[loteria] = estatisticas
+    return estatisticas
+
+
+# --------------------------------------------------
+# CONSULTAS
+# --------------------------------------------------
+def mais_frequentes(loteria: str, qtd: int) -> list[int]:
+    frequencia = carregar_estatisticas(loteria)["frequencia"]
+    ordem = np.argsort(-frequencia[1:], kind="stable") + 1
+    return ordem[:qtd].tolist()
+
+
+def mais_atrasadas(loteria: str, qtd: int) -> list[int]:
+    atraso = carregar_estatisticas(loteria)["atraso"]
+    ordem = np.argsort(-atraso[1:], kind="stable") + 1
+    return ordem[:qtd].tolist()
+
+
+def dezenas_sorteadas(loteria: str) -> list[int]:
+    """Dezenas que já saíram pelo menos uma vez."""
+    return (np.flatnonzero(carregar_estatisticas(loteria)["frequencia"][1:]) + 1).tolist()
+
+
+def _maiores(matriz: np.ndarray, qtd: int) -> list[tuple]:
+    plana = matriz.ravel()
+    qtd = min(qtd, int(np.count_nonzero(plana)))
+    if not qtd:
+        return []
+
+    topo = np.argpartition(-plana, qtd - 1)[:qtd]
+    topo = topo[np.argsort(-plana[topo], kind="stable")]
+
+    return [
+        (*(int(i) for i in np.unravel_index(posicao, matriz.shape)), int(plana[posicao]))
+        for posicao in topo
+    ]
+
+
+def pares_mais_frequentes(loteria: str, qtd: int = 10) -> list[tuple]:
+    """[(a, b, vezes), ...]"""
+    return _maiores(carregar_estatisticas(loteria)["pares"], qtd)
+
+
+def trios_mais_frequentes(loteria: str, qtd: int = 10) -> list[tuple]:
+    """[(a, b, c, vezes), ...]"""
+    return _maiores(carregar_estatisticas(loteria)["trios"], qtd)
@@ -1,10 +1,20 @@
 # core/fechamento_lotofacil.py
-import random
 import sqlite3
 from pathlib import Path
+import numpy as np
+from core import historico, cache_fechamentos
+from core.cobertura import fechar_base, escolher_design, SEM_DESIGN
+from core.filtros import compilar, compilar_filtro, conferir_quantidade
+from core.combinatoria import binomial
+from core.gerador import sortear_distintos, sortear_diversos
+from core.otimizador_orcamento import fechar_orcamento
 
 DB_PATH = Path("db/loterias.db")
 
+# cobertura   : fechamento que garante minimo_acertos (padrão)
+# diversidade : jogos com a menor sobreposição possível entre si
+MODOS = ("cobertura", "diversidade")
+
 
 # --------------------------------------------------
 # PREÇO DO JOGO (BUSCA NO SQLITE)
@@ -35,12 +45,25 @@ def gerar_fechamento(
     numeros_base,
     minimo_acertos,
     dezenas_por_jogo,
-    orcamento
+    orcamento,
+    filtros=None,
+    semente=None,
+    modo="cobertura",
+    design=None
 ):
     """
     Gera o fechamento de jogos da Lotofácil usando preços do SQLite.
+    filtros: especificação de core.filtros, ex. {"pares": (5, 9)}.
+    semente: None deriva a semente dos parâmetros; pedidos iguais
+    reaproveitam o resultado do cache de fechamentos.
+    modo: "cobertura" ou "diversidade" (ver MODOS).
+    design: fechamento da biblioteca (ver cobertura.fechar_base); None
+    usa o atual. Semente + design do log reproduzem os jogos.
     """
 
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: {modo}")
+
     if dezenas_por_jogo < 15 or dezenas_por_jogo > 20:
         raise ValueError("Lotofácil permite de 15 a 20 dezenas por jogo")
 
@@ -53,45 +76,171 @@ def gerar_fechamento(
         )
 
     qtd_jogos_max = int(orcamento // preco_jogo)
+    filtro = compilar_filtro(filtros, "lotofacil")
+
+    if modo != "cobertura":
+        design = SEM_DESIGN
+    elif design is None:
+        design = escolher_design(numeros_base, dezenas_por_jogo, 15, minimo_acertos, qtd_jogos_max, filtro)
+
+    # Semente + parâmetros identificam o resultado (cache compartilhado)
+    parametros = cache_fechamentos.parametros_fechamento(
+        "lotofacil", numeros_base, dezenas_por_jogo, minimo_acertos, orcamento,
+        filtros, preco_jogo, historico.carregar_historico("lotofacil")["versao"], modo, design
+    )
+    semente = cache_fechamentos.semente_padrao(parametros) if semente is None else int(semente)
+    chave = cache_fechamentos.chave_fechamento(parametros, semente)
+
+    em_cache = cache_fechamentos.buscar(chave)
+    if em_cache:
+        return {
+            "jogos": [list(jogo) for jogo in em_cache["jogos"]],
+            "estatisticas": {**em_cache["estatisticas"], "cache": True},
+        }
+
+    rng = np.random.default_rng(semente)
+
+    fechamento = None
+    sobreposicao = None
+
+    if modo == "diversidade":
+        # jogos espalhados: menor número de dezenas em comum entre eles
+        matriz, sobreposicao = sortear_diversos(
+            numeros_base, dezenas_por_jogo, qtd_jogos_max, rng, filtro
+        )
+        jogos = matriz.tolist()
+    else:
+        # Fechamento de verdade: cobre os sorteios de 15 dezenas da base
+        # (biblioteca de fechamentos prontos ou cálculo guloso + otimização)
+        fechamento = fechar_base(
+            numeros_base, dezenas_por_jogo, 15, minimo_acertos, qtd_jogos_max,
+            filtro=filtro, semente=semente, design=design
+        )
 
-    jogos = []
-    for _ in range(qtd_jogos_max):
-        jogo = sorted(random.sample(numeros_base, dezenas_por_jogo))
-        jogos.append(jogo)
+        if fechamento:
+            jogos = fechamento["jogos"]
+        else:
+            # base grande demais para a busca exata: jogos aleatórios distintos
+            # (enumeração completa se o orçamento cobre toda a base)
+            jogos = sortear_distintos(
+                numeros_base, dezenas_por_jogo, qtd_jogos_max, rng, filtro
+            ).tolist()
+
+    # filtros impossíveis (ou restritivos demais) não viram resultado vazio;
+    # uma cobertura completa pode legitimamente usar menos jogos
+    if not jogos or (filtros and not (fechamento and fechamento["cobertura"] == 1.0)):
+        esperado = min(qtd_jogos_max, binomial(len(set(numeros_base)), dezenas_por_jogo))
+        conferir_quantidade(len(jogos), esperado)
 
     estatisticas = {
         "qtd_jogos": len(jogos),
         "minimo_acertos": minimo_acertos,
         "orcamento": orcamento,
         "dezenas_por_jogo": dezenas_por_jogo,
-        "valor_por_jogo": preco_jogo
+        "valor_por_jogo": preco_jogo,
+        "valor_total": len(jogos) * preco_jogo,
+        # fração dos sorteios dentro da base com minimo_acertos garantido
+        # (None = não calculada)
+        "cobertura": fechamento["cobertura"] if fechamento else None,
+        "jogos_economizados": fechamento["economizados"] if fechamento else 0,
+        "origem": fechamento["origem"] if fechamento else ("diversidade" if modo == "diversidade" else "aleatorio"),
+        # busca parou no limite de tempo / jogos aleatórios que completaram o orçamento
+        "cobertura_interrompida": fechamento["interrompido"] if fechamento else False,
+        "jogos_completados": fechamento["completados"] if fechamento else 0,
+        "filtros": filtros or {},
+        "modo": modo,
+        # maior nº de dezenas em comum entre dois jogos (modo diversidade)
+        "sobreposicao_maxima": sobreposicao,
+        "semente": semente,
+        "design": fechamento["design"] if fechamento else SEM_DESIGN,
+        "cache": False,
     }
 
-    return {
+    resultado = {
         "jogos": jogos,
         "estatisticas": estatisticas
     }
+    cache_fechamentos.salvar(chave, "lotofacil", semente, resultado)
+
+    return resultado
 
 
 # --------------------------------------------------
-# HISTÓRICO LOTOFÁCIL
+# FECHAMENTO MISTO (TAMANHOS OTIMIZADOS PELO ORÇAMENTO)
 # --------------------------------------------------
-def carregar_historico():
+def gerar_fechamento_misto(numeros_base, minimo_acertos, orcamento, filtros=None, semente=None):
     """
-    Carrega o histórico de resultados da Lotofácil.
-    Retorna lista de sets.
+    Jogos de 15 a 20 dezenas escolhidos pelo custo-benefício
+    (otimizador_orcamento.fechar_orcamento): para de comprar quando a
+    cobertura da base satura, mesmo sobrando orçamento.
     """
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    compilado = compilar(filtros or {}, "lotofacil")
 
-    colunas = ", ".join(f"dezena{i}" for i in range(1, 16))
-    cursor.execute(
-        f"SELECT {colunas} FROM concursos_lotofacil ORDER BY concurso ASC"
+    VALOR_JOGO = obter_valor_jogo_lotofacil(15)
+    if orcamento < VALOR_JOGO:
+        raise ValueError(
+            f"Orçamento insuficiente. "
+            f"Valor do jogo (15 dezenas): R$ {VALOR_JOGO:.2f}"
+        )
+
+    parametros = cache_fechamentos.parametros_fechamento(
+        "lotofacil", numeros_base, 0, minimo_acertos, orcamento,
+        filtros, VALOR_JOGO, historico.carregar_historico("lotofacil")["versao"], "misto"
     )
-    linhas = cursor.fetchall()
-    conn.close()
+    semente = cache_fechamentos.semente_padrao(parametros) if semente is None else int(semente)
+    chave = cache_fechamentos.chave_fechamento(parametros, semente)
+
+    em_cache = cache_fechamentos.buscar(chave)
+    if em_cache:
+        return {
+            "jogos": [list(jogo) for jogo in em_cache["jogos"]],
+            "estatisticas": {**em_cache["estatisticas"], "cache": True},
+        }
+
+    fechamento = fechar_orcamento("lotofacil", numeros_base, minimo_acertos, orcamento, compilado, semente)
+    jogos = [list(jogo) for jogo in fechamento["jogos"]]
+    conferir_quantidade(len(jogos), 1)
+
+    estatisticas = {
+        "qtd_jogos": len(jogos),
+        "minimo_acertos": minimo_acertos,
+        "orcamento": orcamento,
+        "dezenas_por_jogo": "misto",
+        # {dezenas: quantidade} (chaves em texto para o cache em JSON)
+        "mix": {str(n): qtd for n, qtd in fechamento["mix"].items()},
+        "valor_total": fechamento["custo"],
+        "cobertura": fechamento["cobertura"],
+        "cobertura_saturada": fechamento["saturada"],
+        "cobertura_interrompida": fechamento["interrompido"],
+        # estimativas com os jogos tratados como independentes
+        "cobertura_estimada": fechamento["cobertura_estimada"],
+        "premios_esperados": fechamento["premios_esperados"],
+        "jogos_economizados": 0,
+        "origem": "misto",
+        "filtros": filtros or {},
+        "modo": "misto",
+        "sobreposicao_maxima": None,
+        "semente": semente,
+        "design": SEM_DESIGN,
+        "cache": False,
+    }
 
-    return [set(linha) for linha in linhas]
+    resultado = {"jogos": jogos, "estatisticas": estatisticas}
+    cache_fechamentos.salvar(chave, "lotofacil", semente, resultado)
+
+    return resultado
+
+
+# --------------------------------------------------
+# HISTÓRICO LOTOFÁCIL
+# --------------------------------------------------
+def carregar_historico():
+    """
+    Carrega o histórico de resultados da Lotofácil.
+    Retorna lista de sets (lidos do snapshot memory-mapped).
+    """
+    dezenas = historico.carregar_historico("lotofacil")["dezenas"]
+    return [set(linha) for linha in dezenas.tolist()]
 
 
 # --------------------------------------------------
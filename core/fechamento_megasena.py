@@ -1,7 +1,17 @@
-import random
+import itertools
+import numpy as np
 import pandas as pd
 import sqlite3
 import os
+from core import historico, cache_fechamentos
+from core.cobertura import fechar_base, escolher_design, SEM_DESIGN
+from core.estatisticas import mais_frequentes
+from core.filtros import compilar, avaliar, filtrar_jogos, conferir_quantidade
+from functools import partial
+from core.combinatoria import binomial
+from core.gerador import sortear_jogos, selecionar_diversos, tamanho_pool
+from core.mascaras import codificar
+from core.otimizador_orcamento import fechar_orcamento
 
 DB_PATH = os.path.join("db", "loterias.db")
 
@@ -26,19 +36,17 @@ def obter_valor_jogo_megasena(dezenas_por_jogo: int) -> float:
 
 
 def carregar_historico():
-    """Carrega o histórico de concursos da Mega-Sena do SQLite."""
+    """Carrega o histórico de concursos da Mega-Sena (snapshot memory-mapped)."""
     if not os.path.exists(DB_PATH):
         raise FileNotFoundError(f"Banco não encontrado: {DB_PATH}")
-    
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM concursos_megasena ORDER BY concurso ASC", conn)
-    conn.close()
+
+    dezenas = historico.carregar_historico("megasena")["dezenas"]
 
     # Mega-Sena: sempre 6 dezenas
-    colunas = [f"dezena{i}" for i in range(1, 7)]
-    df = df[colunas].copy()
-    df.columns = [f"D{i}" for i in range(1, 7)]
-    return df
+    return pd.DataFrame(
+        np.asarray(dezenas, dtype=np.int64),
+        columns=[f"D{i}" for i in range(1, 7)]
+    )
 
 def jogo_valido(jogo):
     # 🔹 Garante que tudo seja int
@@ -50,7 +58,98 @@ def jogo_valido(jogo):
     return 2 <= pares <= 4
 
 
-def gerar_fechamento(numeros_base, minimo_acertos=4, dezenas_por_jogo=6, orcamento=None):
+# 🎲 Sorteio construtivo: escolhe quantos pares (peso exato C(E,p)·C(O,n-p))
+# e sorteia pares e ímpares direto, sem rejeição.
+PARES_PERMITIDOS = range(2, 5)
+
+# Pedidos acima desta fração do espaço válido são atendidos enumerando tudo
+FRACAO_ENUMERACAO = 0.5
+LIMITE_ENUMERACAO = 2_000_000
+
+# rodadas de sorteio para completar jogos que passem nos filtros extras
+RODADAS_FILTRO = 200
+
+# cobertura   : fechamento que garante minimo_acertos (padrão)
+# diversidade : jogos com a menor sobreposição possível entre si
+MODOS = ("cobertura", "diversidade")
+
+
+def _pares_impares(numeros_base):
+    base = sorted({int(n) for n in numeros_base})
+    return [n for n in base if n % 2 == 0], [n for n in base if n % 2 == 1]
+
+
+def pesos_paridade(numeros_base, dezenas_por_jogo):
+    """{pares: quantidade de jogos válidos com exatamente esse número de pares}."""
+    pares, impares = _pares_impares(numeros_base)
+    return {
+        p: binomial(len(pares), p) * binomial(len(impares), dezenas_por_jogo - p)
+        for p in PARES_PERMITIDOS
+    }
+
+
+def espaco_valido(numeros_base, dezenas_por_jogo):
+    """Quantos jogos distintos da base passam no jogo_valido."""
+    return sum(pesos_paridade(numeros_base, dezenas_por_jogo).values())
+
+
+def sortear_jogos_validos(numeros_base, dezenas_por_jogo, qtd_jogos, rng=None):
+    """
+    Até qtd_jogos jogos distintos e válidos (2 a 4 pares).
+    Nunca devolve mais que o espaço válido e nunca fica em laço.
+    """
+    rng = rng or np.random.default_rng()
+    pares, impares = _pares_impares(numeros_base)
+    pesos = pesos_paridade(numeros_base, dezenas_por_jogo)
+    total = sum(pesos.values())
+    qtd_jogos = min(qtd_jogos, total)
+
+    if not qtd_jogos:
+        return []
+
+    # quase tudo pedido: enumera o espaço válido e embaralha
+    if qtd_jogos >= total * FRACAO_ENUMERACAO and total <= LIMITE_ENUMERACAO:
+        todos = [
+            tuple(sorted(p + i))
+            for qtd_pares, peso in pesos.items() if peso
+            for p in itertools.combinations(pares, qtd_pares)
+            for i in itertools.combinations(impares, dezenas_por_jogo - qtd_pares)
+        ]
+        return [todos[i] for i in rng.permutation(len(todos))[:qtd_jogos]]
+
+    # menos da metade do espaço: repetições são raras.
+    # Cada rodada gera em lote os jogos que faltam, agrupados por nº de pares.
+    opcoes = np.array(list(pesos))
+    probabilidades = np.array([pesos[p] for p in opcoes], dtype=np.float64) / total
+
+    jogos = set()
+    while len(jogos) < qtd_jogos:
+        sorteio_pares = rng.choice(opcoes, size=qtd_jogos - len(jogos), p=probabilidades)
+
+        for qtd_pares in np.unique(sorteio_pares):
+            n = int((sorteio_pares == qtd_pares).sum())
+            lote = np.hstack([
+                sortear_jogos(pares, int(qtd_pares), n, rng),
+                sortear_jogos(impares, dezenas_por_jogo - int(qtd_pares), n, rng),
+            ])
+            jogos.update(map(tuple, np.sort(lote, axis=1).tolist()))
+
+    return list(jogos)[:qtd_jogos]
+
+
+def gerar_fechamento(numeros_base, minimo_acertos=4, dezenas_por_jogo=6, orcamento=None, filtros=None,
+                     semente=None, modo="cobertura", design=None):
+    """
+    filtros: especificação de core.filtros, aplicada junto com a regra
+    de 2 a 4 pares do jogo_valido.
+    semente: None deriva a semente dos parâmetros; pedidos iguais
+    reaproveitam o resultado do cache de fechamentos.
+    modo: "cobertura" ou "diversidade" (ver MODOS).
+    design: fechamento da biblioteca (ver cobertura.fechar_base); None
+    usa o atual. Semente + design do log reproduzem os jogos.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: {modo}")
 
     # 🔒 SANITIZA A BASE (REMOVE 'D', TEXTOS, ETC)
     numeros_base = [
@@ -58,41 +157,180 @@ def gerar_fechamento(numeros_base, minimo_acertos=4, dezenas_por_jogo=6, orcamen
         if str(n).isdigit() and 1 <= int(n) <= 60
     ]
 
-    df = carregar_historico()
-    numeros = df.values.flatten()
-    freq_abs = pd.Series(numeros).value_counts().sort_index()
-
+    # 📊 base insuficiente: dezenas mais frequentes (estatísticas materializadas)
     if len(numeros_base) < dezenas_por_jogo:
-        numeros_base = (
-            freq_abs.sort_values(ascending=False)
-            .head(dezenas_por_jogo)
-            .index.tolist()
-        )
+        numeros_base = mais_frequentes("megasena", dezenas_por_jogo)
 
     # 🔥 BUSCA VALOR NO SQLITE
     VALOR_JOGO = obter_valor_jogo_megasena(dezenas_por_jogo)
 
+    if orcamento is not None and orcamento < VALOR_JOGO:
+        raise ValueError(
+            f"Orçamento insuficiente. "
+            f"Valor do jogo ({dezenas_por_jogo} dezenas): R$ {VALOR_JOGO:.2f}"
+        )
+
     qtd_jogos = int(orcamento // VALOR_JOGO) if orcamento else 3
 
-    jogos = set()
-    tentativas = 0
-    while len(jogos) < qtd_jogos:
-        jogo = sorted(random.sample(numeros_base, dezenas_por_jogo))
-        if jogo_valido(jogo):
-            jogos.add(tuple(jogo))
+    # 🧰 regra de paridade + filtros pedidos (todos precisam passar)
+    filtro = partial(avaliar, compilar({"pares": (2, 4)}, "megasena") + compilar(filtros or {}, "megasena"))
 
-        tentativas += 1
-        if tentativas > 500_000:
-            break
+    if modo != "cobertura":
+        design = SEM_DESIGN
+    elif design is None:
+        design = escolher_design(numeros_base, dezenas_por_jogo, 6, minimo_acertos, qtd_jogos, filtro)
 
-    jogos = list(jogos)
+    # 🔑 semente + parâmetros identificam o resultado (cache compartilhado)
+    parametros = cache_fechamentos.parametros_fechamento(
+        "megasena", numeros_base, dezenas_por_jogo, minimo_acertos, orcamento,
+        filtros, VALOR_JOGO, historico.carregar_historico("megasena")["versao"], modo, design
+    )
+    semente = cache_fechamentos.semente_padrao(parametros) if semente is None else int(semente)
+    chave = cache_fechamentos.chave_fechamento(parametros, semente)
+
+    em_cache = cache_fechamentos.buscar(chave)
+    if em_cache:
+        return {
+            "jogos": [tuple(jogo) for jogo in em_cache["jogos"]],
+            "estatisticas": {**em_cache["estatisticas"], "cache": True},
+        }
+
+    rng = np.random.default_rng(semente)
+
+    fechamento = None
+    sobreposicao = None
+
+    if modo == "diversidade":
+        # 🌐 pool de jogos válidos e seleção dos mais espalhados
+        qtd_pool = tamanho_pool(qtd_jogos, espaco_valido(numeros_base, dezenas_por_jogo))
+        pool = sortear_jogos_validos(numeros_base, dezenas_por_jogo, qtd_pool, rng)
+        pool = filtrar_jogos(pool, filtro) if filtros else pool
+        indices, sobreposicao = selecionar_diversos(codificar(pool), qtd_jogos, rng)
+        jogos = [tuple(pool[i]) for i in indices]
+    else:
+        # 🎯 Fechamento de verdade: cobre as sextinas possíveis dentro da base
+        # (biblioteca de fechamentos prontos ou cálculo guloso + otimização)
+        fechamento = fechar_base(
+            numeros_base, dezenas_por_jogo, 6, minimo_acertos, qtd_jogos,
+            filtro=filtro, semente=semente, design=design
+        )
+
+        if fechamento:
+            jogos = [tuple(jogo) for jogo in fechamento["jogos"]]
+        else:
+            # base grande demais para a busca exata: sorteio construtivo
+            jogos = sortear_jogos_validos(numeros_base, dezenas_por_jogo, qtd_jogos, rng)
+
+            if filtros:
+                aprovados = set(filtrar_jogos(jogos, filtro))
+                for _ in range(RODADAS_FILTRO):
+                    if len(aprovados) >= len(jogos):
+                        break
+                    lote = sortear_jogos_validos(numeros_base, dezenas_por_jogo, len(jogos) - len(aprovados), rng)
+                    aprovados.update(filtrar_jogos(lote, filtro))
+                jogos = list(aprovados)[:qtd_jogos]
+
+    # filtros impossíveis (ou restritivos demais) não viram resultado vazio;
+    # uma cobertura completa pode legitimamente usar menos jogos
+    if not jogos or (filtros and not (fechamento and fechamento["cobertura"] == 1.0)):
+        conferir_quantidade(len(jogos), min(qtd_jogos, espaco_valido(numeros_base, dezenas_por_jogo)))
 
     estatisticas = {
         "qtd_jogos": len(jogos),
         "dezenas_por_jogo": dezenas_por_jogo,
         "minimo_acertos": minimo_acertos,
         "orcamento": orcamento,
-        "valor_por_jogo": VALOR_JOGO
+        "valor_por_jogo": VALOR_JOGO,
+        "valor_total": len(jogos) * VALOR_JOGO,
+        "jogos_validos_possiveis": espaco_valido(numeros_base, dezenas_por_jogo),
+        # fração das sextinas da base com minimo_acertos garantido (None = não calculada)
+        "cobertura": fechamento["cobertura"] if fechamento else None,
+        "jogos_economizados": fechamento["economizados"] if fechamento else 0,
+        "origem": fechamento["origem"] if fechamento else ("diversidade" if modo == "diversidade" else "aleatorio"),
+        # busca parou no limite de tempo / jogos aleatórios que completaram o orçamento
+        "cobertura_interrompida": fechamento["interrompido"] if fechamento else False,
+        "jogos_completados": fechamento["completados"] if fechamento else 0,
+        "filtros": filtros or {},
+        "modo": modo,
+        # maior nº de dezenas em comum entre dois jogos (modo diversidade)
+        "sobreposicao_maxima": sobreposicao,
+        "semente": semente,
+        "design": fechamento["design"] if fechamento else SEM_DESIGN,
+        "cache": False,
+    }
+
+    resultado = {"jogos": jogos, "estatisticas": estatisticas}
+    cache_fechamentos.salvar(chave, "megasena", semente, resultado)
+
+    return resultado
+
+
+def gerar_fechamento_misto(numeros_base, minimo_acertos, orcamento, filtros=None, semente=None):
+    """
+    Jogos de 6 a 20 dezenas escolhidos pelo custo-benefício
+    (otimizador_orcamento.fechar_orcamento), com a regra de paridade:
+    para de comprar quando a cobertura da base satura, mesmo sobrando
+    orçamento.
+    """
+    numeros_base = [
+        int(n) for n in numeros_base
+        if str(n).isdigit() and 1 <= int(n) <= 60
+    ]
+    if len(numeros_base) < 6:
+        numeros_base = mais_frequentes("megasena", 6)
+
+    compilado = compilar({"pares": (2, 4)}, "megasena") + compilar(filtros or {}, "megasena")
+
+    VALOR_JOGO = obter_valor_jogo_megasena(6)
+    if orcamento < VALOR_JOGO:
+        raise ValueError(
+            f"Orçamento insuficiente. "
+            f"Valor do jogo (6 dezenas): R$ {VALOR_JOGO:.2f}"
+        )
+
+    parametros = cache_fechamentos.parametros_fechamento(
+        "megasena", numeros_base, 0, minimo_acertos, orcamento,
+        filtros, VALOR_JOGO, historico.carregar_historico("megasena")["versao"], "misto"
+    )
+    semente = cache_fechamentos.semente_padrao(parametros) if semente is None else int(semente)
+    chave = cache_fechamentos.chave_fechamento(parametros, semente)
+
+    em_cache = cache_fechamentos.buscar(chave)
+    if em_cache:
+        return {
+            "jogos": [tuple(jogo) for jogo in em_cache["jogos"]],
+            "estatisticas": {**em_cache["estatisticas"], "cache": True},
+        }
+
+    fechamento = fechar_orcamento("megasena", numeros_base, minimo_acertos, orcamento, compilado, semente)
+    jogos = [tuple(jogo) for jogo in fechamento["jogos"]]
+    conferir_quantidade(len(jogos), 1)
+
+    estatisticas = {
+        "qtd_jogos": len(jogos),
+        "minimo_acertos": minimo_acertos,
+        "orcamento": orcamento,
+        "dezenas_por_jogo": "misto",
+        # {dezenas: quantidade} (chaves em texto para o cache em JSON)
+        "mix": {str(n): qtd for n, qtd in fechamento["mix"].items()},
+        "valor_total": fechamento["custo"],
+        "cobertura": fechamento["cobertura"],
+        "cobertura_saturada": fechamento["saturada"],
+        "cobertura_interrompida": fechamento["interrompido"],
+        # estimativas com os jogos tratados como independentes
+        "cobertura_estimada": fechamento["cobertura_estimada"],
+        "premios_esperados": fechamento["premios_esperados"],
+        "jogos_economizados": 0,
+        "origem": "misto",
+        "filtros": filtros or {},
+        "modo": "misto",
+        "sobreposicao_maxima": None,
+        "semente": semente,
+        "design": SEM_DESIGN,
+        "cache": False,
     }
 
-    return {"jogos": jogos, "estatisticas": estatisticas}
+    resultado = {"jogos": jogos, "estatisticas": estatisticas}
+    cache_fechamentos.salvar(chave, "megasena", semente, resultado)
+
+    return resultado
@@ -0,0 +1,156 @@
+# core/filtros.py
+from functools import partial
+import numpy as np
+from core.loterias import obter_loteria
+from core.historico import carregar_historico
+from core.mascaras import codificar, popcount
+
+
+# --------------------------------------------------
+# FILTROS CLÁSSICOS (ESPECIFICAÇÃO DECLARATIVA)
+# --------------------------------------------------
+# Especificação: {nome: (mínimo, máximo)}, limites inclusivos.
+#   pares, primos, fibonacci, moldura, miolo, repetidas -> contagem
+#   soma                                                -> soma das dezenas
+# "repetidas" conta dezenas repetidas do último concurso.
+# A especificação é compilada numa lista de (nome, máscara, min, max) e
+# avaliada sobre um vetor de bitmasks: popcount(jogos & máscara) para as
+# contagens e tabela por byte para a soma.
+PRIMOS = {2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59}
+FIBONACCI = {1, 2, 3, 5, 8, 13, 21, 34, 55}
+
+FILTROS = ("pares", "soma", "moldura", "miolo", "primos", "fibonacci", "repetidas")
+
+# Faixas usuais para apostas simples (15 dezenas / 6 dezenas)
+FILTROS_CLASSICOS = {
+    "lotofacil": {
+        "pares": (5, 9),
+        "soma": (166, 224),
+        "moldura": (8, 11),
+        "primos": (4, 7),
+        "repetidas": (7, 11),
+    },
+    "megasena": {
+        "pares": (2, 4),
+        "soma": (120, 250),
+        "moldura": (1, 5),
+        "primos": (0, 3),
+    },
+}
+
+# soma das dezenas de cada byte da máscara: SOMA_BYTES[byte, valor]
+SOMA_BYTES = np.array(
+    [[sum(8 * j + i + 1 for i in range(8) if b >> i & 1) for b in range(256)] for j in range(8)],
+    dtype=np.int64,
+)
+
+
+def somar_dezenas(mascaras) -> np.ndarray:
+    """Soma das dezenas de cada máscara, sem decodificar os jogos."""
+    octetos = np.ascontiguousarray(mascaras, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    return SOMA_BYTES[np.arange(8), octetos].sum(axis=1)
+
+
+def moldura(universo: int, colunas: int) -> set:
+    """Dezenas da borda do volante (primeira/última linha e coluna)."""
+    linhas = universo // colunas
+    return {
+        d for d in range(1, universo + 1)
+        if (d - 1) // colunas in (0, linhas - 1) or (d - 1) % colunas in (0, colunas - 1)
+    }
+
+
+def _conjunto(nome: str, loteria: str) -> set:
+    cfg = obter_loteria(loteria)
+    universo = cfg["universo"]
+
+    if nome == "pares":
+        return set(range(2, universo + 1, 2))
+    if nome == "primos":
+        return {d for d in PRIMOS if d <= universo}
+    if nome == "fibonacci":
+        return {d for d in FIBONACCI if d <= universo}
+    if nome == "moldura":
+        return moldura(universo, cfg["colunas"])
+    if nome == "miolo":
+        return set(range(1, universo + 1)) - moldura(universo, cfg["colunas"])
+    if nome == "repetidas":
+        return {int(d) for d in carregar_historico(loteria)["dezenas"][-1]}
+
+    raise ValueError(f"Filtro desconhecido: {nome}")
+
+
+def compilar(spec: dict, loteria: str) -> list[tuple]:
+    """
+    Valida a especificação e resolve cada filtro em (nome, máscara, min, max).
+    A soma usa máscara 0 (não é contagem).
+    """
+    compilado = []
+
+    for nome, faixa in spec.items():
+        if nome not in FILTROS:
+            raise ValueError(f"Filtro desconhecido: {nome}")
+
+        minimo, maximo = (int(v) for v in faixa)
+        if minimo > maximo:
+            raise ValueError(f"Faixa inválida para {nome}: {minimo} > {maximo}")
+
+        mascara = 0 if nome == "soma" else int(codificar([_conjunto(nome, loteria)])[0])
+        compilado.append((nome, mascara, minimo, maximo))
+
+    return compilado
+
+
+def avaliar(compilado: list[tuple], mascaras) -> np.ndarray:
+    """Array booleano: quais máscaras passam em todos os filtros."""
+    mascaras = np.asarray(mascaras, dtype=np.uint64)
+    aprovados = np.ones(len(mascaras), dtype=bool)
+
+    for nome, mascara, minimo, maximo in compilado:
+        if nome == "soma":
+            valores = somar_dezenas(mascaras)
+        else:
+            valores = popcount(mascaras & np.uint64(mascara))
+        aprovados &= (valores >= minimo) & (valores <= maximo)
+
+    return aprovados
+
+
+def compilar_filtro(spec: dict | None, loteria: str):
+    """
+    Função máscaras -> booleanos pronta para o motor de cobertura
+    (partial de função de módulo: pode ir para o pool de processos).
+    None quando não há filtros.
+    """
+    if not spec:
+        return None
+
+    return partial(avaliar, compilar(spec, loteria))
+
+
+def conferir_quantidade(qtd_jogos: int, esperado: int):
+    """
+    ValueError quando os filtros deixaram menos jogos que o espaço sem
+    filtros permitiria (ou nenhum): melhor avisar que gerar menos.
+    """
+    if qtd_jogos < max(1, esperado):
+        raise ValueError(
+            f"Os filtros deixam apenas {qtd_jogos} jogo(s) possível(is) nesta base "
+            f"(pedido: {esperado}). Remova filtros, amplie a base ou reduza o orçamento."
+        )
+
+
+def filtrar_jogos(jogos, filtro) -> list:
+    """Mantém os jogos (listas de dezenas) aprovados pelo filtro."""
+    if filtro is None or not len(jogos):
+        return list(jogos)
+
+    aprovados = filtro(codificar(jogos))
+    return [jogo for jogo, ok in zip(jogos, aprovados) if ok]
+
+
+def descrever(spec: dict | None) -> str:
+    if not spec:
+        return "nenhum"
+
+    return ", ".join(f"{nome} {minimo}-{maximo}" for nome, (minimo, maximo) in spec.items())
@@ -0,0 +1,195 @@
+# core/gerador.py
+import numpy as np
+from core.combinatoria import binomial, desranquear, ranquear
+from core.mascaras import codificar, popcount
+
+
+# --------------------------------------------------
+# GERAÇÃO DE JOGOS EM LOTE
+# --------------------------------------------------
+# Em vez de um random.sample por jogo, gera a matriz (qtd, k) inteira:
+#   - chaves aleatórias (qtd, base) e argpartition: as k menores chaves
+#     de cada linha são uma combinação uniforme da base;
+#   - ou ranks aleatórios em [0, C(base, k)) desranqueados (colex).
+# Saída: matriz uint8 ordenada por linha, pronta para codificar(),
+# filtros vetorizados e deduplicação por máscara/rank.
+CELULAS_POR_BLOCO = 4_000_000
+
+# Jogos distintos: pedidos acima desta fração do espaço são atendidos
+# enumerando (permutação de todos os ranks) em vez de sortear e descartar.
+FRACAO_ENUMERACAO = 0.5
+LIMITE_ENUMERACAO = 4_000_000
+RODADAS = 200
+
+# Seleção diversificada: tamanho do pool limitado por células (pool x jogos)
+CELULAS_SELECAO = 200_000_000
+POOL_MAXIMO = 200_000
+
+
+def sortear_jogos(numeros_base, dezenas_por_jogo: int, qtd: int,
+                  rng: np.random.Generator | None = None) -> np.ndarray:
+    """
+    qtd jogos uniformes (com possível repetição) de dezenas_por_jogo
+    dezenas da base, via argpartition de uma matriz aleatória.
+    """
+    base = np.asarray(sorted({int(n) for n in numeros_base}), dtype=np.uint8)
+    if dezenas_por_jogo > len(base):
+        raise ValueError("Base menor que a quantidade de dezenas por jogo.")
+
+    rng = rng or np.random.default_rng()
+    jogos = np.empty((qtd, dezenas_por_jogo), dtype=np.uint8)
+    if not qtd or not dezenas_por_jogo:
+        return jogos
+
+    passo = max(1, CELULAS_POR_BLOCO // len(base))
+    for inicio in range(0, qtd, passo):
+        linhas = min(passo, qtd - inicio)
+        chaves = rng.random((linhas, len(base)))
+        escolhidos = np.argpartition(chaves, dezenas_por_jogo - 1, axis=1)[:, :dezenas_por_jogo]
+        jogos[inicio:inicio + linhas] = base[np.sort(escolhidos, axis=1)]
+
+    return jogos
+
+
+def sortear_por_rank(numeros_base, dezenas_por_jogo: int, qtd: int,
+                     rng: np.random.Generator | None = None) -> np.ndarray:
+    """
+    Mesmo resultado do sortear_jogos, sorteando ranks colex no espaço
+    local da base e desranqueando (útil quando o rank já é a chave).
+    """
+    base = np.asarray(sorted({int(n) for n in numeros_base}), dtype=np.uint8)
+    total = binomial(len(base), dezenas_por_jogo)
+    if not total:
+        raise ValueError("Base menor que a quantidade de dezenas por jogo.")
+
+    rng = rng or np.random.default_rng()
+    ranks = rng.integers(0, total, size=qtd, dtype=np.uint64)
+
+    return base[desranquear(ranks, dezenas_por_jogo).astype(np.int64) - 1]
+
+
+def sortear_distintos(numeros_base, dezenas_por_jogo: int, qtd: int,
+                      rng: np.random.Generator | None = None, filtro=None,
+                      excluir=None) -> np.ndarray:
+    """
+    Até qtd jogos DISTINTOS da base (nunca mais que C(base, k)).
+    A unicidade é garantida sobre os ranks colex locais (np.unique /
+    setdiff1d). filtro: função máscaras -> booleanos (core.filtros).
+    excluir: jogos já escolhidos, descartados antes de cortar em qtd.
+    """
+    base = np.asarray(sorted({int(n) for n in numeros_base}), dtype=np.uint8)
+    total = binomial(len(base), dezenas_por_jogo)
+    rng = rng or np.random.default_rng()
+
+    excluidos = np.zeros(0, dtype=np.uint64)
+    if excluir is not None and len(excluir):
+        # dezenas -> posições locais (1..len(base)) -> ranks colex locais
+        locais = np.searchsorted(base, np.asarray(excluir, dtype=np.int64)) + 1
+        excluidos = np.unique(ranquear(locais))
+
+    qtd = min(qtd, total - len(excluidos))
+
+    def para_jogos(ranks):
+        return base[desranquear(ranks, dezenas_por_jogo).astype(np.int64) - 1]
+
+    def enumerar(fora, qtd):
+        ranks = rng.permutation(total).astype(np.uint64)
+        jogos = para_jogos(ranks[~np.isin(ranks, fora)])
+        if filtro is not None:
+            jogos = jogos[filtro(codificar(jogos))]
+        return jogos[:qtd]
+
+    if qtd <= 0:
+        return np.empty((0, dezenas_por_jogo), dtype=np.uint8)
+
+    # quase todo o espaço (ou mais): enumera em ordem aleatória
+    if qtd >= (total - len(excluidos)) * FRACAO_ENUMERACAO and total <= LIMITE_ENUMERACAO:
+        return enumerar(excluidos, qtd)
+
+    escolhidos = np.zeros(0, dtype=np.uint64)
+    for _ in range(RODADAS):
+        faltam = qtd - len(escolhidos)
+        if faltam <= 0:
+            break
+
+        novos = np.unique(rng.integers(0, total, size=faltam, dtype=np.uint64))
+        novos = np.setdiff1d(novos, escolhidos, assume_unique=True)
+        novos = np.setdiff1d(novos, excluidos, assume_unique=True)
+        if filtro is not None:
+            novos = novos[filtro(codificar(para_jogos(novos)))]
+
+        escolhidos = np.concatenate([escolhidos, novos])
+
+    # filtro que aprova pouco: as rodadas não bastaram, enumera o restante
+    if len(escolhidos) < qtd and total <= LIMITE_ENUMERACAO:
+        restantes = enumerar(np.concatenate([excluidos, escolhidos]), qtd - len(escolhidos))
+        return np.concatenate([para_jogos(escolhidos), restantes])
+
+    return para_jogos(escolhidos)
+
+
+# --------------------------------------------------
+# SELEÇÃO DIVERSIFICADA (MENOR SOBREPOSIÇÃO)
+# --------------------------------------------------
+# Guloso "ponto mais distante": cada candidato guarda a maior
+# sobreposição (dezenas em comum) com os jogos já escolhidos; entra o de
+# menor valor (desempate pela soma das sobreposições). Escolher um jogo
+# atualiza o pool inteiro com um único popcount vetorizado: O(pool) por
+# jogo, sem laço par a par.
+def selecionar_diversos(mascaras, qtd: int, rng: np.random.Generator | None = None):
+    """
+    Índices de qtd máscaras bem espalhadas e a maior sobreposição entre
+    quaisquer dois jogos escolhidos.
+    """
+    mascaras = np.asarray(mascaras, dtype=np.uint64)
+    qtd = min(qtd, len(mascaras))
+    rng = rng or np.random.default_rng()
+
+    if not qtd:
+        return np.zeros(0, dtype=np.int64), 0
+
+    maior = np.zeros(len(mascaras), dtype=np.int64)
+    soma = np.zeros(len(mascaras), dtype=np.int64)
+    livre = np.ones(len(mascaras), dtype=bool)
+
+    escolhidos = [int(rng.integers(len(mascaras)))]
+    sobreposicao_maxima = 0
+
+    while True:
+        ultimo = escolhidos[-1]
+        livre[ultimo] = False
+        if len(escolhidos) == qtd:
+            break
+
+        comuns = popcount(mascaras & mascaras[ultimo]).astype(np.int64)
+        np.maximum(maior, comuns, out=maior)
+        soma += comuns
+
+        # chave lexicográfica (maior, soma); jogos já escolhidos ficam de fora
+        chave = np.where(livre, maior * (qtd * 64) + soma, np.iinfo(np.int64).max)
+        proximo = int(np.argmin(chave))
+
+        sobreposicao_maxima = max(sobreposicao_maxima, int(maior[proximo]))
+        escolhidos.append(proximo)
+
+    return np.array(escolhidos, dtype=np.int64), sobreposicao_maxima
+
+
+def tamanho_pool(qtd: int, total: int) -> int:
+    """Pool de candidatos para a seleção diversificada."""
+    return min(total, POOL_MAXIMO, max(2 * qtd, CELULAS_SELECAO // max(1, qtd)))
+
+
+def sortear_diversos(numeros_base, dezenas_por_jogo: int, qtd: int,
+                     rng: np.random.Generator | None = None, filtro=None):
+    """
+    Sorteia um pool de jogos distintos (aprovados pelo filtro) e escolhe
+    qtd bem espalhados. Retorna (matriz de jogos, sobreposição máxima).
+    """
+    rng = rng or np.random.default_rng()
+    total = binomial(len({int(n) for n in numeros_base}), dezenas_por_jogo)
+
+    pool = sortear_distintos(numeros_base, dezenas_por_jogo, tamanho_pool(qtd, total), rng, filtro)
+    indices, sobreposicao = selecionar_diversos(codificar(pool), qtd, rng)
+
+    return pool[indices], sobreposicao
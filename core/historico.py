@@ -0,0 +1,178 @@
+# core/historico.py
+import os
+import shutil
+import sqlite3
+import numpy as np
+from pathlib import Path
+from config import DB_PATH
+from core.loterias import obter_loteria
+from core.mascaras import codificar
+
+
+# --------------------------------------------------
+# SNAPSHOT BINÁRIO DO HISTÓRICO
+# --------------------------------------------------
+# Gerado pelos scripts de ingestão em:
+#   db/historico/<loteria>/<ultimo_concurso>/{concursos,dezenas,mascaras,datas,premios}.npy
+#   db/historico/<loteria>/ATUAL   -> versão vigente (último concurso)
+# Os arrays são abertos com mmap, sem cópia nem consulta ao SQLite.
+SNAPSHOT_DIR = Path(DB_PATH).parent / "historico"
+ARRAYS_SNAPSHOT = ("concursos", "dezenas", "mascaras", "datas", "premios")
+
+_cache = {}
+
+
+def _data_para_iso(data: str | None) -> str:
+    # API devolve dd/mm/aaaa; valores fora do padrão viram NaT
+    if data and len(data) == 10 and data[2] == "/" and data[5] == "/":
+        return f"{data[6:]}-{data[3:5]}-{data[:2]}"
+    return "NaT"
+
+
+def _ler_sqlite(loteria: str) -> dict:
+    cfg = obter_loteria(loteria)
+
+    colunas = ", ".join(f"dezena{i}" for i in range(1, cfg["sorteadas"] + 1))
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute(f"PRAGMA table_info({cfg['tabela']})")
+    tem_data_iso = "data_iso" in [col[1] for col in cursor.fetchall()]
+
+    cursor.execute(
+        f"SELECT {'data_iso' if tem_data_iso else 'NULL'}, data, concurso, {colunas} "
+        f"FROM {cfg['tabela']} ORDER BY concurso ASC"
+    )
+    linhas = cursor.fetchall()
+
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (cfg["tabela_premios"],)
+    )
+    rateio = []
+    if cursor.fetchone():
+        cursor.execute(f"SELECT concurso, acertos, valor FROM {cfg['tabela_premios']}")
+        rateio = cursor.fetchall()
+
+    conn.close()
+
+    dados = np.array([linha[2:] for linha in linhas], dtype=np.int32).reshape(
+        -1, cfg["sorteadas"] + 1
+    )
+    dezenas = dados[:, 1:].astype(np.uint8)
+    datas = np.array(
+        [iso or _data_para_iso(data) for iso, data, *_ in linhas],
+        dtype="datetime64[D]"
+    )
+
+    # premios[i, j] = valor pago no concurso i para a faixa j (0 se ausente)
+    faixas = cfg["faixas"]
+    premios = np.zeros((len(dados), len(faixas)), dtype=np.float64)
+    if rateio:
+        rateio = np.array(rateio, dtype=np.float64).reshape(-1, 3)
+        posicoes = np.searchsorted(dados[:, 0], rateio[:, 0])
+        validos = (
+            (posicoes < len(dados))
+            & (rateio[:, 1] >= faixas[0]) & (rateio[:, 1] <= faixas[-1])
+        )
+        validos[validos] &= dados[posicoes[validos], 0] == rateio[validos, 0]
+        premios[posicoes[validos], (rateio[validos, 1] - faixas[0]).astype(np.intp)] = rateio[validos, 2]
+
+    return {
+        "concursos": dados[:, 0],
+        "dezenas": dezenas,
+        "mascaras": codificar(dezenas, cfg["dtype"]),
+        "datas": datas,
+        "premios": premios,
+        "versao": int(dados[-1, 0]) if len(dados) else 0,
+    }
+
+
+def gerar_snapshot(loteria: str) -> int:
+    """
+    Grava o snapshot binário do histórico a partir do SQLite e
+    retorna a versão (número do último concurso).
+    """
+    historico = _ler_sqlite(loteria)
+    versao = historico["versao"]
+
+    pasta_loteria = SNAPSHOT_DIR / loteria
+    pasta_versao = pasta_loteria / str(versao)
+    pasta_tmp = pasta_loteria / f".{versao}.tmp"
+
+    shutil.rmtree(pasta_tmp, ignore_errors=True)
+    pasta_tmp.mkdir(parents=True)
+    for nome in ARRAYS_SNAPSHOT:
+        np.save(pasta_tmp / f"{nome}.npy", historico[nome])
+
+    shutil.rmtree(pasta_versao, ignore_errors=True)
+    os.replace(pasta_tmp, pasta_versao)
+
+    # troca atômica do ponteiro de versão
+    ponteiro_tmp = pasta_loteria / "ATUAL.tmp"
+    ponteiro_tmp.write_text(str(versao))
+    os.replace(ponteiro_tmp, pasta_loteria / "ATUAL")
+
+    # remove versões antigas
+    for pasta in pasta_loteria.iterdir():
+        if pasta.is_dir() and pasta.name != str(versao) and not pasta.name.startswith("."):
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    return versao
+
+
+def _abrir_snapshot(loteria: str) -> dict | None:
+    ponteiro = SNAPSHOT_DIR / loteria / "ATUAL"
+
+    try:
+        marca = ponteiro.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    em_cache = _cache.get(loteria)
+    if em_cache and em_cache[0] == marca:
+        return em_cache[1]
+
+    versao = ponteiro.read_text().strip()
+    pasta = SNAPSHOT_DIR / loteria / versao
+
+    try:
+        historico = {
+            nome: np.load(pasta / f"{nome}.npy", mmap_mode="r")
+            for nome in ARRAYS_SNAPSHOT
+        }
+    except (FileNotFoundError, ValueError):
+        return None
+
+    historico["versao"] = int(versao)
+    _cache[loteria] = (marca, historico)
+
+    return historico
+
+
+# --------------------------------------------------
+# HISTÓRICO EM FORMATO VETORIZADO
+# --------------------------------------------------
+def carregar_historico(loteria: str) -> dict:
+    """
+    Carrega o histórico de concursos como arrays NumPy (memory-mapped).
+
+    Retorna dict com:
+        concursos : número de cada concurso (ordem crescente)
+        dezenas   : matriz (concursos, dezenas sorteadas)
+        mascaras  : bitmask de cada concurso
+        datas     : data do sorteio (datetime64[D], NaT se desconhecida)
+        premios   : matriz (concursos, faixas) com o rateio pago por faixa
+        versao    : número do último concurso do snapshot
+    """
+    historico = _abrir_snapshot(loteria)
+
+    if historico is None:
+        try:
+            gerar_snapshot(loteria)
+        except OSError:
+            pass
+        historico = _abrir_snapshot(loteria) or _ler_sqlite(loteria)
+
+    return historico
@@ -0,0 +1,87 @@
+# core/indice.py
+import numpy as np
+from core.historico import carregar_historico
+from core.loterias import obter_loteria
+
+
+# --------------------------------------------------
+# ÍNDICE INVERTIDO DEZENA -> CONCURSOS
+# --------------------------------------------------
+# Matriz de incidência (universo + 1, concursos) com 1 nos concursos em
+# que a dezena foi sorteada; a linha 0 fica vazia para que a linha d
+# corresponda diretamente à dezena d.
+#
+# Sai do snapshot do histórico (core.historico), que os refresh scripts
+# já regeravam: não há cópia própria no SQLite para manter em dia. Fica
+# em memória até o snapshot mudar de versão.
+
+_cache = {}
+
+
+def matriz_incidencia(dezenas: np.ndarray, universo: int) -> np.ndarray:
+    """
+    Matriz (universo + 1, concursos) com 1 onde a dezena saiu no concurso.
+    """
+    dezenas = np.asarray(dezenas, dtype=np.intp)
+    incidencia = np.zeros((universo + 1, len(dezenas)), dtype=np.uint8)
+    colunas = np.repeat(np.arange(len(dezenas)), dezenas.shape[1])
+    incidencia[dezenas.ravel(), colunas] = 1
+
+    return incidencia
+
+
+def carregar_indice(loteria: str) -> dict:
+    """
+    Índice da loteria com a matriz em "incidencia" (universo + 1, concursos).
+    Recalcula só quando o snapshot ganha concursos novos.
+    """
+    historico = carregar_historico(loteria)
+
+    em_cache = _cache.get(loteria)
+    if em_cache and em_cache["ultimo_concurso"] == historico["versao"]:
+        return em_cache
+
+    indice = {
+        "qtd_concursos": len(historico["dezenas"]),
+        "ultimo_concurso": historico["versao"],
+        "incidencia": matriz_incidencia(historico["dezenas"], obter_loteria(loteria)["universo"]),
+    }
+    _cache[loteria] = indice
+
+    return indice
+
+
+# --------------------------------------------------
+# CONSULTAS SOBRE O ÍNDICE
+# --------------------------------------------------
+# Usadas por core.estatisticas; os backtests conferem os jogos pelas
+# máscaras de bits (core.motor_backtest).
+def frequencias(indice: dict) -> np.ndarray:
+    """
+    Quantas vezes cada dezena foi sorteada (posição 0 sem uso).
+    """
+    return indice["incidencia"].sum(axis=1, dtype=np.int64)
+
+
+def atrasos(indice: dict) -> np.ndarray:
+    """
+    Concursos desde a última vez que cada dezena saiu.
+    Dezena nunca sorteada recebe qtd_concursos.
+    """
+    incidencia = indice["incidencia"]
+    qtd = incidencia.shape[1]
+
+    invertida = incidencia[:, ::-1]
+    saiu = invertida.any(axis=1)
+    atraso = np.where(saiu, invertida.argmax(axis=1), qtd)
+
+    return atraso.astype(np.int64)
+
+
+def coocorrencia(indice: dict) -> np.ndarray:
+    """
+    Matriz (universo + 1, universo + 1) com quantas vezes cada par
+    de dezenas saiu junto. A diagonal é a frequência.
+    """
+    incidencia = indice["incidencia"].astype(np.float32)
+    return np.rint(incidencia @ incidencia.T).astype(np.int64)
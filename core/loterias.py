@@ -0,0 +1,58 @@
+# core/loterias.py
+import sqlite3
+import numpy as np
+from config import DB_PATH
+
+
+# --------------------------------------------------
+# PARÂMETROS DE CADA LOTERIA
+# --------------------------------------------------
+# universo   : maior dezena do volante
+# sorteadas  : dezenas sorteadas por concurso (= aposta simples)
+# faixas     : acertos que pagam prêmio
+# dtype      : inteiro sem sinal que comporta uma dezena por bit
+# colunas    : colunas do volante (5x5 na Lotofácil, 6x10 na Mega-Sena)
+LOTERIAS = {
+    "lotofacil": {
+        "universo": 25,
+        "sorteadas": 15,
+        "faixas": range(11, 16),
+        "tabela": "concursos_lotofacil",
+        "tabela_precos": "lotofacil_precos",
+        "tabela_premios": "premios_lotofacil",
+        "dtype": np.uint32,
+        "colunas": 5,
+    },
+    "megasena": {
+        "universo": 60,
+        "sorteadas": 6,
+        "faixas": range(4, 7),
+        "tabela": "concursos_megasena",
+        "tabela_precos": "megasena_precos",
+        "tabela_premios": "premios_megasena",
+        "dtype": np.uint64,
+        "colunas": 10,
+    },
+}
+
+
+def obter_loteria(loteria: str) -> dict:
+    if loteria not in LOTERIAS:
+        raise ValueError(f"Loteria desconhecida: {loteria}")
+
+    return LOTERIAS[loteria]
+
+
+def carregar_precos(loteria: str) -> dict:
+    """
+    Preço atual de cada tamanho de jogo: {dezenas: valor}.
+    """
+    cfg = obter_loteria(loteria)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT dezenas, valor FROM {cfg['tabela_precos']}")
+    precos = {int(dezenas): float(valor) for dezenas, valor in cursor.fetchall()}
+    conn.close()
+
+    return precos
@@ -0,0 +1,61 @@
+# core/mascaras.py
+import numpy as np
+
+
+# --------------------------------------------------
+# CODIFICAÇÃO EM BITMASK
+# --------------------------------------------------
+# A dezena d ocupa o bit (d - 1). Lotofácil cabe em uint32
+# (25 bits) e Mega-Sena em uint64 (60 bits).
+def codificar(dezenas, dtype=np.uint64) -> np.ndarray:
+    """
+    Converte uma matriz (qtd, dezenas) ou lista de jogos em vetor de máscaras.
+    Aceita jogos de tamanhos diferentes quando recebe lista.
+    """
+    if isinstance(dezenas, np.ndarray) and dezenas.ndim == 2:
+        bits = np.left_shift(dtype(1), (dezenas - 1).astype(dtype))
+        return np.bitwise_or.reduce(bits, axis=1).astype(dtype)
+
+    mascaras = np.zeros(len(dezenas), dtype=dtype)
+    for i, jogo in enumerate(dezenas):
+        m = 0
+        for d in jogo:
+            m |= 1 << (int(d) - 1)
+        mascaras[i] = m
+
+    return mascaras
+
+
+def decodificar(mascara: int) -> list[int]:
+    """
+    Converte uma máscara de volta para a lista ordenada de dezenas.
+    """
+    mascara = int(mascara)
+    dezenas = []
+    d = 1
+    while mascara:
+        if mascara & 1:
+            dezenas.append(d)
+        mascara >>= 1
+        d += 1
+
+    return dezenas
+
+
+# --------------------------------------------------
+# POPCOUNT VETORIZADO
+# --------------------------------------------------
+_BITS_POR_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_tabela(valores: np.ndarray) -> np.ndarray:
+    valores = np.ascontiguousarray(valores)
+    bytes_ = valores.view(np.uint8).reshape(*valores.shape, valores.itemsize)
+    return _BITS_POR_BYTE[bytes_].sum(axis=-1, dtype=np.uint8)
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(valores: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(valores)
+else:
+    popcount = _popcount_tabela
@@ -0,0 +1,537 @@
+# core/motor_backtest.py
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from core.loterias import obter_loteria, carregar_precos
+from core.mascaras import codificar, popcount
+from core.combinatoria import binomial
+from core.historico import carregar_historico
+from core import cache_backtest
+
+
+# Limite de células (jogos x concursos) processadas por bloco.
+# Mantém o AND intermediário em poucas dezenas de MB.
+CELULAS_POR_BLOCO = 4_000_000
+
+# Acima deste número de jogos o backtest é dividido em fatias e
+# distribuído num pool de processos. Medido num processo só, contra
+# ~3.000 concursos: 14 mil jogos 0,1 s; 100 mil 0,65 s; 1 milhão 6,5 s
+# (~6,5 us por jogo). Subir os workers e copiar o histórico custa
+# algumas décimas de segundo, então o pool só compensa a partir de
+# centenas de milhares de jogos (refresh do cache, backtests gigantes);
+# os blocos de 2.000 jogos do backtest progressivo nunca chegam nele.
+LIMIAR_PARALELO = 200_000
+JOGOS_POR_FATIA = 50_000
+
+
+# --------------------------------------------------
+# MATRIZ DE ACERTOS
+# --------------------------------------------------
+def blocos_de_jogos(qtd_jogos: int, qtd_concursos: int):
+    """
+    Gera fatias de jogos de forma que cada bloco caiba em CELULAS_POR_BLOCO.
+    """
+    tamanho = max(1, CELULAS_POR_BLOCO // max(1, qtd_concursos))
+    for inicio in range(0, qtd_jogos, tamanho):
+        yield slice(inicio, min(inicio + tamanho, qtd_jogos))
+
+
+def matriz_acertos(mascaras_jogos: np.ndarray, mascaras_concursos: np.ndarray) -> np.ndarray:
+    """
+    Retorna matriz (jogos, concursos) com a quantidade de acertos
+    de cada jogo em cada concurso.
+    """
+    acertos = np.empty((len(mascaras_jogos), len(mascaras_concursos)), dtype=np.uint8)
+
+    for bloco in blocos_de_jogos(len(mascaras_jogos), len(mascaras_concursos)):
+        acertos[bloco] = popcount(
+            mascaras_jogos[bloco, None] & mascaras_concursos[None, :]
+        )
+
+    return acertos
+
+
+def distribuicao_acertos(mascaras_jogos, mascaras_concursos, sorteadas: int) -> np.ndarray:
+    """
+    Retorna matriz (jogos, sorteadas + 1): quantos concursos cada jogo
+    acertou exatamente 0, 1, ..., sorteadas dezenas.
+    """
+    largura = sorteadas + 1
+    distribuicao = np.zeros((len(mascaras_jogos), largura), dtype=np.int64)
+
+    for bloco in blocos_de_jogos(len(mascaras_jogos), len(mascaras_concursos)):
+        acertos = popcount(mascaras_jogos[bloco, None] & mascaras_concursos[None, :])
+        qtd = acertos.shape[0]
+        linhas = np.arange(qtd, dtype=np.int64)[:, None] * largura
+        distribuicao[bloco] = np.bincount(
+            (linhas + acertos).ravel(), minlength=qtd * largura
+        ).reshape(qtd, largura)
+
+    return distribuicao
+
+
+# --------------------------------------------------
+# EXECUÇÃO EM POOL DE PROCESSOS
+# --------------------------------------------------
+_historico_worker = {}
+
+
+def _iniciar_worker(mascaras_concursos: np.ndarray, sorteadas: int):
+    # cada worker recebe o histórico uma única vez
+    _historico_worker["mascaras"] = mascaras_concursos
+    _historico_worker["sorteadas"] = sorteadas
+
+
+def _distribuicao_fatia(mascaras_jogos: np.ndarray) -> np.ndarray:
+    return distribuicao_acertos(
+        mascaras_jogos, _historico_worker["mascaras"], _historico_worker["sorteadas"]
+    )
+
+
+def calcular_distribuicao(mascaras_jogos, mascaras_concursos, sorteadas: int,
+                          processos: int | None = None) -> np.ndarray:
+    """
+    Igual a distribuicao_acertos, mas divide conjuntos grandes
+    (>= LIMIAR_PARALELO jogos) entre processos. O resultado mantém
+    a ordem dos jogos.
+    """
+    processos = processos or os.cpu_count() or 1
+
+    if len(mascaras_jogos) < LIMIAR_PARALELO or processos < 2:
+        return distribuicao_acertos(mascaras_jogos, mascaras_concursos, sorteadas)
+
+    fatias = [
+        mascaras_jogos[i:i + JOGOS_POR_FATIA]
+        for i in range(0, len(mascaras_jogos), JOGOS_POR_FATIA)
+    ]
+
+    with ProcessPoolExecutor(
+        max_workers=min(processos, len(fatias)),
+        initializer=_iniciar_worker,
+        initargs=(np.asarray(mascaras_concursos), sorteadas),
+    ) as executor:
+        partes = list(executor.map(_distribuicao_fatia, fatias))
+
+    return np.vstack(partes)
+
+
+# --------------------------------------------------
+# BACKTEST
+# --------------------------------------------------
+def pesos_apostas(tamanho: int, sorteadas: int, faixas) -> np.ndarray:
+    """
+    Matriz (sorteadas + 1, faixas): quantas apostas simples com exatamente
+    f acertos existem dentro de um jogo de `tamanho` dezenas que acertou h.
+    Escolhe f entre os h acertos e o resto entre os (tamanho - h) erros:
+        C(h, f) * C(tamanho - h, sorteadas - f)
+    """
+    return np.array([
+        [binomial(h, f) * binomial(tamanho - h, sorteadas - f) for f in faixas]
+        for h in range(sorteadas + 1)
+    ], dtype=np.int64)
+
+
+def contar_apostas(distribuicao: np.ndarray, tamanhos, sorteadas: int, faixas) -> np.ndarray:
+    """
+    Apostas simples premiadas por faixa (jogos, faixas) a partir da
+    distribuição de acertos, sem enumerar as apostas: um jogo de 20
+    dezenas custa o mesmo que um de 15.
+    """
+    tamanhos = np.asarray(tamanhos)
+    apostas = np.zeros((len(distribuicao), len(faixas)), dtype=np.int64)
+
+    for tamanho in np.unique(tamanhos):
+        linhas = tamanhos == tamanho
+        apostas[linhas] = distribuicao[linhas] @ pesos_apostas(int(tamanho), sorteadas, faixas)
+
+    return apostas
+
+
+def montar_resultado(distribuicao: np.ndarray, faixas, inicio: int = 1,
+                     apostas: np.ndarray | None = None) -> list[dict]:
+    """
+    Converte a distribuição de acertos no formato usado pelo bot:
+    [{"jogo": 1, 11: ..., 12: ..., "apostas": {11: ..., ...}}, ...]
+    As chaves numéricas contam concursos pelo acerto do jogo inteiro;
+    "apostas" conta as apostas simples premiadas contidas no jogo.
+    """
+    faixas = list(faixas)
+    resultado = []
+
+    for pos, linha in enumerate(distribuicao):
+        item = {"jogo": pos + inicio, **{f: int(linha[f]) for f in faixas}}
+        if apostas is not None:
+            item["apostas"] = {f: int(v) for f, v in zip(faixas, apostas[pos])}
+        resultado.append(item)
+
+    return resultado
+
+
+def atualizar_distribuicoes(loteria: str, entradas: dict, historico: dict) -> dict:
+    """
+    Leva entradas {chave: (versao, distribuicao)} para a versão do histórico
+    somando apenas os concursos posteriores à versão de cada entrada.
+    Se a distribuição não bate com a quantidade de concursos até aquela
+    versão (histórico reescrito), o jogo é recalculado por inteiro.
+    """
+    cfg = obter_loteria(loteria)
+    concursos = np.asarray(historico["concursos"])
+
+    por_versao = {}
+    for chave, (versao, distribuicao) in entradas.items():
+        por_versao.setdefault(versao, []).append((chave, distribuicao))
+
+    atualizadas = {}
+    recalcular = []
+
+    for versao, itens in por_versao.items():
+        inicio = int(np.searchsorted(concursos, versao, side="right"))
+        validos = [(c, d) for c, d in itens if d.sum() == inicio]
+        recalcular += [c for c, d in itens if d.sum() != inicio]
+
+        if not validos:
+            continue
+
+        if inicio == len(concursos):
+            atualizadas.update(validos)
+            continue
+
+        mascaras = codificar([c.split(",") for c, _ in validos], cfg["dtype"])
+        delta = distribuicao_acertos(
+            mascaras, historico["mascaras"][inicio:], cfg["sorteadas"]
+        )
+        for (chave, distribuicao), extra in zip(validos, delta):
+            atualizadas[chave] = distribuicao + extra
+
+    if recalcular:
+        mascaras = codificar([c.split(",") for c in recalcular], cfg["dtype"])
+        completas = calcular_distribuicao(mascaras, historico["mascaras"], cfg["sorteadas"])
+        atualizadas.update(zip(recalcular, completas))
+
+    return atualizadas
+
+
+def distribuicao_com_cache(loteria: str, jogos, historico: dict) -> np.ndarray:
+    """
+    Distribuição de acertos por jogo, consultando o cache antes de
+    calcular. Entradas antigas recebem só os concursos novos e os
+    jogos ausentes passam pelo motor vetorizado.
+    """
+    cfg = obter_loteria(loteria)
+    versao = historico["versao"]
+
+    chaves = [cache_backtest.chave_jogo(jogo) for jogo in jogos]
+    encontrados = cache_backtest.buscar(loteria, list(dict.fromkeys(chaves)), versao)
+
+    prontos = {c: d for c, (v, d) in encontrados.items() if v == versao}
+    antigos = {c: e for c, e in encontrados.items() if e[0] != versao}
+    faltantes = list(dict.fromkeys(c for c in chaves if c not in encontrados))
+
+    novos = atualizar_distribuicoes(loteria, antigos, historico)
+    if faltantes:
+        mascaras = codificar([c.split(",") for c in faltantes], cfg["dtype"])
+        calculadas = calcular_distribuicao(mascaras, historico["mascaras"], cfg["sorteadas"])
+        novos.update(zip(faltantes, calculadas))
+
+    cache_backtest.salvar(loteria, novos, versao)
+    prontos.update(novos)
+
+    return np.array([prontos[c] for c in chaves], dtype=np.int64).reshape(
+        len(chaves), cfg["sorteadas"] + 1
+    )
+
+
+def atualizar_cache_backtest(loteria: str) -> int:
+    """
+    Pós-ingestão: leva todas as entradas do cache persistente para a
+    versão atual do histórico. Retorna quantos jogos foram atualizados.
+    """
+    historico = carregar_historico(loteria)
+    versao = historico["versao"]
+    total = 0
+
+    while True:
+        entradas = cache_backtest.listar_desatualizadas(loteria, versao)
+        if not entradas:
+            return total
+
+        cache_backtest.salvar(
+            loteria, atualizar_distribuicoes(loteria, entradas, historico), versao
+        )
+        total += len(entradas)
+
+
+def rodar_backtest(loteria: str, jogos, historico: dict | None = None) -> list[dict]:
+    """
+    Backtest vetorizado: confere todos os jogos contra todos os
+    concursos de uma vez usando bitmasks.
+
+    Sem histórico explícito usa o histórico oficial e o cache de backtest
+    (jogos repetidos custam apenas uma consulta).
+    """
+    cfg = obter_loteria(loteria)
+
+    if historico is None:
+        distribuicao = distribuicao_com_cache(loteria, jogos, carregar_historico(loteria))
+    else:
+        distribuicao = calcular_distribuicao(
+            codificar(jogos, cfg["dtype"]), historico["mascaras"], cfg["sorteadas"]
+        )
+
+    apostas = contar_apostas(
+        distribuicao, [len(j) for j in jogos], cfg["sorteadas"], cfg["faixas"]
+    )
+
+    return montar_resultado(distribuicao, cfg["faixas"], apostas=apostas)
+
+
+def rodar_backtest_progressivo(loteria: str, jogos, jogos_por_bloco: int = 2_000):
+    """
+    Versão em gerador do rodar_backtest. A cada bloco produz:
+        processados : jogos conferidos até agora
+        total       : total de jogos
+        resultado   : linhas do bloco (mesmo formato do rodar_backtest)
+        resumo      : {faixa: total acumulado}
+    Concatenar os "resultado" reproduz exatamente o rodar_backtest.
+    """
+    cfg = obter_loteria(loteria)
+    historico = carregar_historico(loteria)
+    jogos = list(jogos)
+
+    resumo = {f: 0 for f in cfg["faixas"]}
+
+    for inicio in range(0, len(jogos), jogos_por_bloco):
+        bloco = jogos[inicio:inicio + jogos_por_bloco]
+        distribuicao = distribuicao_com_cache(loteria, bloco, historico)
+
+        apostas = contar_apostas(
+            distribuicao, [len(j) for j in bloco], cfg["sorteadas"], cfg["faixas"]
+        )
+
+        for f in cfg["faixas"]:
+            resumo[f] += int(distribuicao[:, f].sum())
+
+        yield {
+            "processados": inicio + len(bloco),
+            "total": len(jogos),
+            "resultado": montar_resultado(
+                distribuicao, cfg["faixas"], inicio=inicio + 1, apostas=apostas
+            ),
+            "resumo": dict(resumo),
+        }
+
+
+# --------------------------------------------------
+# BACKTEST POR JANELA / PERÍODO
+# --------------------------------------------------
+# Janelas são pares (inicio, fim) de posições no histórico, fim exclusivo.
+def janela_ultimos(historico: dict, qtd: int) -> tuple[int, int]:
+    total = len(historico["mascaras"])
+    return max(0, total - qtd), total
+
+
+def _janela_por_mascara(selecionados: np.ndarray) -> tuple[int, int]:
+    posicoes = np.flatnonzero(selecionados)
+    if not len(posicoes):
+        return 0, 0
+    return int(posicoes[0]), int(posicoes[-1]) + 1
+
+
+def janela_datas(historico: dict, inicio, fim) -> tuple[int, int]:
+    """
+    Concursos sorteados entre as datas inicio e fim (inclusive).
+    Concursos sem data (NaT) ficam de fora.
+    """
+    datas = np.asarray(historico["datas"])
+    return _janela_por_mascara(
+        (datas >= np.datetime64(inicio, "D")) & (datas <= np.datetime64(fim, "D"))
+    )
+
+
+def janelas_anuais(historico: dict) -> dict:
+    """
+    Uma janela por ano civil: {2023: (inicio, fim), ...}
+    """
+    datas = np.asarray(historico["datas"])
+    validas = ~np.isnat(datas)
+    anos = datas.astype("datetime64[Y]").astype(np.int64) + 1970
+
+    return {
+        int(ano): _janela_por_mascara(validas & (anos == ano))
+        for ano in np.unique(anos[validas])
+    }
+
+
+def backtest_janelas(loteria: str, jogos, janelas: dict, historico: dict | None = None) -> dict:
+    """
+    Backtest restrito a várias janelas de uma só vez.
+
+    Para cada bloco de jogos monta a soma acumulada, ao longo dos
+    concursos, dos indicadores de cada faixa; o total de uma janela é
+    acumulado[fim] - acumulado[inicio], sem reprocessar concursos.
+
+    Retorna {nome_janela: [{"jogo": 1, 11: ..., ...}, ...]}.
+    """
+    cfg = obter_loteria(loteria)
+
+    if historico is None:
+        historico = carregar_historico(loteria)
+
+    faixas = np.array(list(cfg["faixas"]), dtype=np.uint8)
+    mascaras_jogos = codificar(jogos, cfg["dtype"])
+    qtd_concursos = len(historico["mascaras"])
+    dtype = np.uint16 if qtd_concursos < 2 ** 16 else np.uint32
+
+    totais = {
+        nome: np.zeros((len(mascaras_jogos), len(faixas)), dtype=np.int64)
+        for nome in janelas
+    }
+
+    for bloco in blocos_de_jogos(len(mascaras_jogos), qtd_concursos * len(faixas)):
+        acertos = popcount(mascaras_jogos[bloco, None] & historico["mascaras"][None, :])
+        indicador = acertos[:, :, None] == faixas[None, None, :]
+
+        acumulado = np.zeros((acertos.shape[0], qtd_concursos + 1, len(faixas)), dtype=dtype)
+        np.cumsum(indicador, axis=1, dtype=dtype, out=acumulado[:, 1:])
+
+        for nome, (inicio, fim) in janelas.items():
+            totais[nome][bloco] = acumulado[:, fim].astype(np.int64) - acumulado[:, inicio]
+
+    return {
+        nome: [
+            {"jogo": idx, **{int(f): int(v) for f, v in zip(faixas, linha)}}
+            for idx, linha in enumerate(matriz, start=1)
+        ]
+        for nome, matriz in totais.items()
+    }
+
+
+def backtest_ultimos(loteria: str, jogos, qtd_concursos: int) -> list[dict]:
+    """
+    Atalho: backtest apenas nos últimos qtd_concursos concursos.
+    """
+    historico = carregar_historico(loteria)
+    janela = janela_ultimos(historico, qtd_concursos)
+
+    return backtest_janelas(loteria, jogos, {"ultimos": janela}, historico)["ultimos"]
+
+
+# --------------------------------------------------
+# BACKTEST FINANCEIRO (RATEIO x ACERTOS)
+# --------------------------------------------------
+def _retorno_por_jogo(mascaras_jogos, tamanho: int, historico: dict, cfg: dict) -> np.ndarray:
+    """
+    Valor recebido por cada jogo somando todos os concursos.
+
+    valor_por_acerto[h, c] = quanto um jogo de `tamanho` dezenas que acertou
+    h dezenas recebeu no concurso c (apostas simples x rateio). O retorno de
+    cada jogo é a soma de valor_por_acerto[acertos[jogo, c], c].
+    """
+    premios = np.asarray(historico["premios"])
+    valor_por_acerto = pesos_apostas(tamanho, cfg["sorteadas"], cfg["faixas"]) @ premios.T
+
+    qtd_concursos = len(historico["mascaras"])
+    colunas = np.arange(qtd_concursos)
+    retorno = np.zeros(len(mascaras_jogos), dtype=np.float64)
+
+    for bloco in blocos_de_jogos(len(mascaras_jogos), qtd_concursos):
+        acertos = popcount(mascaras_jogos[bloco, None] & historico["mascaras"][None, :])
+        retorno[bloco] = valor_por_acerto[acertos, colunas].sum(axis=1)
+
+    return retorno
+
+
+def backtest_financeiro(loteria: str, jogos, historico: dict | None = None) -> dict:
+    """
+    Quanto cada jogo teria pago jogando em todos os concursos do histórico.
+
+    Retorna:
+        jogos : [{"jogo": 1, "retorno": R$, "custo": R$, "roi": fração}, ...]
+        total : {"retorno", "custo", "roi", "concursos"} do conjunto
+
+    O custo usa o preço atual de cada tamanho de jogo. Faixas sem ganhador
+    no concurso (rateio 0) não somam nada.
+    """
+    cfg = obter_loteria(loteria)
+
+    if historico is None:
+        historico = carregar_historico(loteria)
+
+    precos = carregar_precos(loteria)
+    qtd_concursos = len(historico["mascaras"])
+
+    tamanhos = np.array([len(j) for j in jogos])
+    mascaras_jogos = codificar(jogos, cfg["dtype"])
+    retorno = np.zeros(len(jogos), dtype=np.float64)
+    custo = np.zeros(len(jogos), dtype=np.float64)
+
+    for tamanho in np.unique(tamanhos):
+        if int(tamanho) not in precos:
+            raise ValueError(f"Não há preço cadastrado para jogos de {tamanho} dezenas")
+
+        linhas = tamanhos == tamanho
+        retorno[linhas] = _retorno_por_jogo(mascaras_jogos[linhas], int(tamanho), historico, cfg)
+        custo[linhas] = precos[int(tamanho)] * qtd_concursos
+
+    def roi(ret, cst):
+        return float((ret - cst) / cst) if cst else 0.0
+
+    return {
+        "jogos": [
+            {"jogo": idx, "retorno": float(r), "custo": float(c), "roi": roi(r, c)}
+            for idx, (r, c) in enumerate(zip(retorno, custo), start=1)
+        ],
+        "total": {
+            "retorno": float(retorno.sum()),
+            "custo": float(custo.sum()),
+            "roi": roi(retorno.sum(), custo.sum()),
+            "concursos": qtd_concursos,
+        },
+    }
+
+
+# --------------------------------------------------
+# BACKTEST DO CONJUNTO (CARTEIRA)
+# --------------------------------------------------
+def melhor_acerto_por_concurso(mascaras_jogos, mascaras_concursos) -> np.ndarray:
+    """
+    Maior acerto obtido por qualquer jogo do conjunto em cada concurso
+    (máximo por coluna da matriz de acertos, calculado por blocos).
+    """
+    melhor = np.zeros(len(mascaras_concursos), dtype=np.uint8)
+
+    for bloco in blocos_de_jogos(len(mascaras_jogos), len(mascaras_concursos)):
+        acertos = popcount(mascaras_jogos[bloco, None] & mascaras_concursos[None, :])
+        np.maximum(melhor, acertos.max(axis=0), out=melhor)
+
+    return melhor
+
+
+def backtest_carteira(loteria: str, jogos, minimo_acertos: int,
+                      historico: dict | None = None) -> dict:
+    """
+    Avalia o conjunto de jogos como um todo, que é o que o fechamento
+    promete. Retorna:
+        melhor_por_concurso : array com o maior acerto do conjunto em cada concurso
+        distribuicao        : {acertos: concursos em que esse foi o melhor acerto}
+        concursos_com_minimo: concursos em que algum jogo fez minimo_acertos ou mais
+        taxa_minimo         : fração desses concursos sobre o total
+    """
+    cfg = obter_loteria(loteria)
+
+    if historico is None:
+        historico = carregar_historico(loteria)
+
+    melhor = melhor_acerto_por_concurso(
+        codificar(jogos, cfg["dtype"]), historico["mascaras"]
+    )
+    contagem = np.bincount(melhor, minlength=cfg["sorteadas"] + 1)
+    com_minimo = int((melhor >= minimo_acertos).sum())
+
+    return {
+        "melhor_por_concurso": melhor,
+        "distribuicao": {h: int(contagem[h]) for h in range(cfg["sorteadas"] + 1)},
+        "concursos_com_minimo": com_minimo,
+        "taxa_minimo": com_minimo / len(melhor) if len(melhor) else 0.0,
+        "concursos": len(melhor),
+    }
@@ -0,0 +1,259 @@
+# core/otimizador_orcamento.py
+import math
+from functools import lru_cache, partial
+import numpy as np
+from core.loterias import obter_loteria, carregar_precos
+from core.combinatoria import binomial, mascaras_combinacoes
+from core.cobertura import gerar_cobertura_ponderada, local_para_real, real_para_local, contar_cobertos
+from core.filtros import avaliar
+from core.gerador import sortear_jogos, sortear_distintos
+from core.mascaras import codificar, decodificar
+
+
+# --------------------------------------------------
+# MISTURA DE TAMANHOS DE JOGO DENTRO DO ORÇAMENTO
+# --------------------------------------------------
+# Para cada tamanho n (com preço cadastrado e n <= base), supondo o
+# sorteio dentro da base de v dezenas:
+#   P(h acertos) = C(n, h) C(v - n, m - h) / C(v, m)
+#   p_n          = P(h >= alvo)                   (o jogo "cobre" o sorteio)
+#   premios_n    = E[apostas simples com >= alvo] (soma de C(h,f) C(n-h,m-f))
+#
+# Base pequena: guloso exato de custo-benefício (cobertura.
+# gerar_cobertura_ponderada): entra o jogo, de qualquer tamanho, que
+# cobre mais sorteios descobertos por real. Para ao cobrir todos os
+# sorteios: o que sobra do orçamento não é gasto.
+# Base grande: compra por -log(1 - p_n) / preço (jogos tratados como
+# independentes) até a cobertura saturar (menos de 1 sorteio descoberto
+# esperado) ou o orçamento acabar.
+#
+# Tamanhos sem nenhum jogo que passe na paridade/filtros ficam de fora
+# (no guloso exato eles simplesmente não têm candidatos).
+TAMANHOS = {
+    "lotofacil": range(15, 21),
+    "megasena": range(6, 21),
+}
+
+# jogos sorteados por tamanho para estimar a fração que passa nos filtros
+AMOSTRA_FILTRO = 4_096
+
+
+def probabilidades_tamanho(tamanho_base: int, tamanho: int, sorteadas: int,
+                           minimo_acertos: int) -> tuple[float, float]:
+    """(p_n, premios_n) de um jogo de `tamanho` dezenas da base."""
+    total = binomial(tamanho_base, sorteadas)
+    p = 0.0
+    premios = 0.0
+
+    for h in range(minimo_acertos, min(tamanho, sorteadas) + 1):
+        chance = binomial(tamanho, h) * binomial(tamanho_base - tamanho, sorteadas - h) / total
+        p += chance
+        premios += chance * sum(
+            binomial(h, f) * binomial(tamanho - h, sorteadas - f)
+            for f in range(minimo_acertos, h + 1)
+        )
+
+    return p, premios
+
+
+def faixa_orcamento(orcamento: int, menor_preco: int) -> int:
+    """Teto da faixa do orçamento: menor preço x potência de 2."""
+    return menor_preco << max(0, math.ceil(math.log2(max(1, orcamento) / menor_preco)))
+
+
+def _chave_local(base: tuple, compilado: tuple) -> tuple[tuple, tuple]:
+    """
+    (base, filtros) da memoização no espaço local. Filtros de contagem
+    viram máscaras sobre as posições da base (bit i = base[i]), então
+    bases do mesmo tamanho com a mesma projeção dividem a sequência; a
+    soma depende das dezenas reais e mantém a base exata na chave.
+    """
+    if any(nome == "soma" for nome, *_ in compilado):
+        return base, compilado
+
+    local = tuple(
+        (nome, sum(1 << i for i, dezena in enumerate(base) if mascara >> (dezena - 1) & 1), minimo, maximo)
+        for nome, mascara, minimo, maximo in compilado
+    )
+    return tuple(range(1, len(base) + 1)), local
+
+
+@lru_cache(maxsize=256)
+def _sequencia_exata(loteria: str, base: tuple, minimo_acertos: int, teto: int,
+                     precos: tuple, compilado: tuple) -> dict | None:
+    """
+    Ordem de compra do guloso exato para qualquer orçamento até teto
+    (memoizada por faixa de orçamento, não pelo valor exato). base e
+    compilado vêm de _chave_local: máscaras no espaço local.
+    """
+    filtro = partial(avaliar, list(compilado)) if compilado else None
+    cobertura = gerar_cobertura_ponderada(
+        base, dict(precos), obter_loteria(loteria)["sorteadas"], minimo_acertos, teto, filtro
+    )
+    if cobertura is None:
+        return None
+
+    return {
+        "jogos": tuple((n, mascara, custo) for n, mascara, custo, _ in cobertura["jogos"]),
+        "saturada": cobertura["saturada"],
+        "interrompido": cobertura["interrompido"],
+    }
+
+
+def _mix_exato(sequencia: dict, base, orcamento: int) -> tuple[list, bool]:
+    """
+    Jogos da sequência na ordem, pulando os que não cabem no que resta.
+    True quando nenhum foi pulado e o guloso parou por saturação (não
+    pelo teto da faixa nem pelo limite de trabalho).
+    """
+    jogos = []
+    restante = orcamento
+
+    for n, mascara, custo in sequencia["jogos"]:
+        if custo <= restante:
+            jogos.append(mascara)
+            restante -= custo
+
+    saturada = (
+        len(jogos) == len(sequencia["jogos"])
+        and sequencia["saturada"] and not sequencia["interrompido"]
+    )
+    if not jogos:
+        return [], saturada
+
+    return local_para_real(np.array(jogos, dtype=np.uint64), base), saturada
+
+
+def _cobertura_exata(jogos, base, sorteadas: int, minimo_acertos: int) -> float:
+    """Fração dos sorteios da base em que algum jogo faz minimo_acertos."""
+    sorteios = mascaras_combinacoes(len(base), sorteadas, np.uint64)
+    total = len(sorteios)
+
+    for jogo in real_para_local(jogos, base):
+        if not len(sorteios):
+            break
+        sorteios = sorteios[~contar_cobertos(jogo, sorteios, minimo_acertos)]
+
+    return 1 - len(sorteios) / total
+
+
+def _taxa_filtro(base, tamanho: int, filtro, rng) -> float:
+    """Fração estimada dos jogos de `tamanho` dezenas que passa no filtro."""
+    if filtro is None:
+        return 1.0
+
+    jogos = sortear_jogos(base, tamanho, AMOSTRA_FILTRO, rng)
+    return float(filtro(codificar(jogos)).mean())
+
+
+def _mix_estimado(loteria: str, base, minimo_acertos: int, orcamento: int,
+                  precos: dict, filtro, rng) -> tuple[list, bool]:
+    """Base grande: tamanhos por custo-benefício até saturar a cobertura."""
+    sorteadas = obter_loteria(loteria)["sorteadas"]
+    v = len(base)
+    total = binomial(v, sorteadas)
+
+    opcoes = []
+    for n, custo in precos.items():
+        p, _ = probabilidades_tamanho(v, n, sorteadas, minimo_acertos)
+        taxa = _taxa_filtro(base, n, filtro, rng)
+        if p <= 0 or taxa <= 0:
+            continue
+        peso = math.inf if p >= 1 else -math.log1p(-p)
+        opcoes.append((peso / custo, n, custo, peso, int(binomial(v, n) * taxa)))
+
+    jogos = []
+    restante = orcamento
+    # log do número esperado de sorteios ainda descobertos
+    log_descobertos = math.log(total)
+
+    for _, n, custo, peso, espaco in sorted(opcoes, reverse=True):
+        if log_descobertos < 0:
+            break
+
+        necessarios = 1 if math.isinf(peso) else math.floor(log_descobertos / peso) + 1
+        qtd = min(restante // custo, necessarios, espaco)
+        if qtd <= 0:
+            continue
+
+        novos = sortear_distintos(base, n, qtd, rng, filtro)
+        jogos += novos.tolist()
+        restante -= len(novos) * custo
+        log_descobertos -= len(novos) * peso
+
+    return jogos, log_descobertos < 0
+
+
+def fechar_orcamento(loteria: str, numeros_base, minimo_acertos: int, orcamento: float,
+                     compilado=None, semente: int | None = None) -> dict:
+    """
+    Escolhe e monta jogos de tamanhos variados dentro do orçamento.
+    compilado: filtros já compilados (core.filtros.compilar), inclusive a
+    paridade da Mega-Sena.
+
+        jogos              : lista de jogos (dezenas reais)
+        mix                : {dezenas_por_jogo: quantidade}
+        custo              : valor total dos jogos
+        cobertura          : fração exata dos sorteios da base com a
+                             garantia (None = base grande, não calculada)
+        saturada           : True quando mais orçamento não aumentaria a
+                             cobertura (a sobra não é gasta)
+        interrompido       : o guloso exato parou no limite de trabalho
+        cobertura_estimada : chance de ao menos um jogo fazer o alvo
+                             (sorteio dentro da base, jogos independentes)
+        premios_esperados  : apostas simples premiadas esperadas por sorteio
+    """
+    cfg = obter_loteria(loteria)
+    sorteadas = cfg["sorteadas"]
+    base = tuple(sorted({int(n) for n in numeros_base}))
+    v = len(base)
+
+    precos = {
+        tamanho: int(round(valor * 100))
+        for tamanho, valor in carregar_precos(loteria).items()
+        if tamanho in TAMANHOS[loteria] and tamanho <= v
+    }
+    if not precos:
+        raise ValueError("Nenhum tamanho de jogo com preço cadastrado cabe na base.")
+
+    orcamento_centavos = int(round(orcamento * 100))
+    compilado = tuple(compilado or ())
+    filtro = partial(avaliar, list(compilado)) if compilado else None
+
+    base_chave, compilado_chave = _chave_local(base, compilado)
+    sequencia = _sequencia_exata(
+        loteria, base_chave, minimo_acertos,
+        faixa_orcamento(orcamento_centavos, min(precos.values())),
+        tuple(sorted(precos.items())), compilado_chave
+    )
+
+    if sequencia is not None:
+        mascaras, saturada = _mix_exato(sequencia, base, orcamento_centavos)
+        jogos = [decodificar(mascara) for mascara in mascaras]
+    else:
+        jogos, saturada = _mix_estimado(
+            loteria, base, minimo_acertos, orcamento_centavos, precos, filtro,
+            np.random.default_rng(semente)
+        )
+
+    mix = {}
+    for jogo in jogos:
+        mix[len(jogo)] = mix.get(len(jogo), 0) + 1
+
+    nao_cobre = 1.0
+    premios = 0.0
+    for tamanho, qtd in mix.items():
+        p, premios_n = probabilidades_tamanho(v, tamanho, sorteadas, minimo_acertos)
+        nao_cobre *= (1 - p) ** qtd
+        premios += qtd * premios_n
+
+    return {
+        "jogos": jogos,
+        "mix": dict(sorted(mix.items())),
+        "custo": sum(qtd * precos[n] for n, qtd in mix.items()) / 100,
+        "cobertura": _cobertura_exata(jogos, base, sorteadas, minimo_acertos) if sequencia is not None else None,
+        "saturada": saturada,
+        "interrompido": bool(sequencia and sequencia["interrompido"]),
+        "cobertura_estimada": 1 - nao_cobre,
+        "premios_esperados": premios,
+    }
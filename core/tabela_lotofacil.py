@@ -0,0 +1,189 @@
+# core/tabela_lotofacil.py
+import os
+import shutil
+import numpy as np
+from pathlib import Path
+from config import DB_PATH
+from core.combinatoria import mascaras_combinacoes, ranquear
+from core.historico import carregar_historico
+from core.mascaras import decodificar, popcount
+
+
+# --------------------------------------------------
+# TABELA HISTÓRICA DE TODOS OS JOGOS DE 15 DEZENAS
+# --------------------------------------------------
+# C(25, 15) = 3.268.760 jogos. Para cada um guardamos quantas vezes fez
+# 11, 12, 13, 14 e 15 pontos, numa matriz uint16 indexada pelo rank colex:
+#   db/tabela_lotofacil/<ultimo_concurso>/contagens.npy   (3.268.760 x 5)
+#   db/tabela_lotofacil/ATUAL  -> "<ultimo_concurso>,<qtd_concursos>"
+# Backtest de um jogo de 15 dezenas vira uma leitura na linha do seu rank.
+TABELA_DIR = Path(DB_PATH).parent / "tabela_lotofacil"
+FAIXAS = range(11, 16)
+
+_cache = {}
+
+
+def _todas_mascaras() -> np.ndarray:
+    if "mascaras" not in _cache:
+        _cache["mascaras"] = mascaras_combinacoes(25, 15, np.uint32)
+    return _cache["mascaras"]
+
+
+def _somar_concursos(contagens: np.ndarray, mascaras_concursos):
+    todas = _todas_mascaras()
+    linear = contagens.reshape(-1)
+
+    for concurso in np.asarray(mascaras_concursos, dtype=np.uint32):
+        acertos = popcount(todas & concurso)
+        premiados = np.flatnonzero(acertos >= FAIXAS[0])
+        # cada jogo aparece uma vez por concurso: soma direta sem add.at
+        linear[premiados * len(FAIXAS) + (acertos[premiados] - FAIXAS[0])] += 1
+
+
+def _gravar(contagens: np.ndarray, ultimo: int, qtd: int):
+    pasta_tmp = TABELA_DIR / f".{ultimo}.tmp"
+    shutil.rmtree(pasta_tmp, ignore_errors=True)
+    pasta_tmp.mkdir(parents=True)
+    np.save(pasta_tmp / "contagens.npy", contagens)
+
+    pasta_versao = TABELA_DIR / str(ultimo)
+    shutil.rmtree(pasta_versao, ignore_errors=True)
+    os.replace(pasta_tmp, pasta_versao)
+
+    ponteiro_tmp = TABELA_DIR / "ATUAL.tmp"
+    ponteiro_tmp.write_text(f"{ultimo},{qtd}")
+    os.replace(ponteiro_tmp, TABELA_DIR / "ATUAL")
+
+    for pasta in TABELA_DIR.iterdir():
+        if pasta.is_dir() and pasta.name != str(ultimo) and not pasta.name.startswith("."):
+            shutil.rmtree(pasta, ignore_errors=True)
+
+
+def disponivel() -> bool:
+    return (TABELA_DIR / "ATUAL").exists()
+
+
+def carregar_tabela() -> dict | None:
+    """
+    Abre a tabela (mmap). Retorna None se ainda não foi construída.
+    """
+    ponteiro = TABELA_DIR / "ATUAL"
+
+    try:
+        marca = ponteiro.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    em_cache = _cache.get("tabela")
+    if em_cache and em_cache[0] == marca:
+        return em_cache[1]
+
+    ultimo, qtd = map(int, ponteiro.read_text().split(","))
+    tabela = {
+        "ultimo_concurso": ultimo,
+        "qtd_concursos": qtd,
+        "contagens": np.load(TABELA_DIR / str(ultimo) / "contagens.npy", mmap_mode="r"),
+    }
+    _cache["tabela"] = (marca, tabela)
+
+    return tabela
+
+
+def construir_tabela() -> dict:
+    """
+    Constrói a tabela do zero percorrendo todo o histórico (offline).
+    """
+    historico = carregar_historico("lotofacil")
+
+    contagens = np.zeros((len(_todas_mascaras()), len(FAIXAS)), dtype=np.uint16)
+    _somar_concursos(contagens, historico["mascaras"])
+    _gravar(contagens, historico["versao"], len(historico["mascaras"]))
+
+    return carregar_tabela()
+
+
+def atualizar_tabela() -> dict:
+    """
+    Soma à tabela apenas os concursos posteriores à sua versão.
+    Reconstrói se o histórico foi reescrito antes dessa versão.
+    """
+    tabela = carregar_tabela()
+    if tabela is None:
+        return construir_tabela()
+
+    historico = carregar_historico("lotofacil")
+    concursos = np.asarray(historico["concursos"])
+    inicio = int(np.searchsorted(concursos, tabela["ultimo_concurso"], side="right"))
+
+    if inicio != tabela["qtd_concursos"]:
+        return construir_tabela()
+
+    if inicio == len(concursos):
+        return tabela
+
+    contagens = np.array(tabela["contagens"])
+    _somar_concursos(contagens, historico["mascaras"][inicio:])
+    _gravar(contagens, historico["versao"], len(concursos))
+
+    return carregar_tabela()
+
+
+def tabela_atualizada() -> dict | None:
+    tabela = carregar_tabela()
+    if tabela is None:
+        return None
+
+    if tabela["ultimo_concurso"] != carregar_historico("lotofacil")["versao"]:
+        tabela = atualizar_tabela()
+
+    return tabela
+
+
+# --------------------------------------------------
+# CONSULTAS
+# --------------------------------------------------
+def backtest_tabela(jogos, inicio: int = 1) -> list[dict]:
+    """
+    Backtest de jogos de 15 dezenas por consulta direta à tabela.
+    Mesmo formato do rodar_backtest (inicio: número do primeiro jogo).
+    """
+    tabela = tabela_atualizada()
+    if tabela is None:
+        raise FileNotFoundError("Tabela da Lotofácil ainda não foi construída.")
+
+    linhas = tabela["contagens"][ranquear(jogos).astype(np.int64)]
+
+    # jogo de 15 dezenas = uma única aposta simples
+    resultado = []
+    for idx, linha in enumerate(linhas.tolist(), start=inicio):
+        contagem = dict(zip(FAIXAS, linha))
+        resultado.append({"jogo": idx, **contagem, "apostas": dict(contagem)})
+
+    return resultado
+
+
+def melhores_jogos(qtd: int, faixa_minima: int = 11) -> list[dict]:
+    """
+    Os qtd jogos de 15 dezenas com mais prêmios históricos a partir de
+    faixa_minima pontos (argpartition sobre a tabela inteira).
+    """
+    tabela = tabela_atualizada()
+    if tabela is None:
+        raise FileNotFoundError("Tabela da Lotofácil ainda não foi construída.")
+
+    contagens = tabela["contagens"]
+    pontuacao = contagens[:, faixa_minima - FAIXAS[0]:].sum(axis=1, dtype=np.int64)
+
+    qtd = min(qtd, len(pontuacao))
+    melhores = np.argpartition(-pontuacao, qtd - 1)[:qtd]
+    melhores = melhores[np.argsort(-pontuacao[melhores], kind="stable")]
+
+    todas = _todas_mascaras()
+    return [
+        {
+            "jogo": decodificar(todas[rank]),
+            "rank": int(rank),
+            **{f: int(v) for f, v in zip(FAIXAS, contagens[rank])},
+        }
+        for rank in melhores
+    ]
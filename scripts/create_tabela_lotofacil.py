@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+# Permite importar o pacote core rodando o script a partir da raiz
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from core.tabela_lotofacil import construir_tabela
+
+
+def criar_tabela_lotofacil():
+    """
+    Constrói (do zero) a tabela histórica de todos os 3.268.760 jogos
+    de 15 dezenas da Lotofácil. Depois disso o refresh_results_lotofacil.py
+    só soma os concursos novos.
+    """
+    tabela = construir_tabela()
+    print(
+        f"✅ Tabela da Lotofácil construída até o concurso "
+        f"{tabela['ultimo_concurso']} ({tabela['qtd_concursos']} concursos)."
+    )
+
+
+if __name__ == "__main__":
+    criar_tabela_lotofacil()
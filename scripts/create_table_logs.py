@@ -36,12 +36,26 @@ def criar_tabela_logs():
             backtest INTEGER DEFAULT 0,
             csv_backtest INTEGER DEFAULT 0,
 
+            semente INTEGER,
+            design TEXT,
+
             FOREIGN KEY (id_usuario) REFERENCES usuarios(telegram_id),
             FOREIGN KEY (id_plano) REFERENCES planos(codigo)
         );
     """)
 
     conn.commit()
+
+    # Semente e fechamento da biblioteca (bancos antigos não têm as colunas)
+    cursor.execute("PRAGMA table_info(logs)")
+    colunas = [col[1] for col in cursor.fetchall()]
+    if "semente" not in colunas:
+        cursor.execute("ALTER TABLE logs ADD COLUMN semente INTEGER")
+        conn.commit()
+    if "design" not in colunas:
+        cursor.execute("ALTER TABLE logs ADD COLUMN design TEXT")
+        conn.commit()
+
     conn.close()
 
     print("✅ Tabela 'logs' criada com sucesso.")
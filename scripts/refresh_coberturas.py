@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+# Permite importar o pacote core rodando o script a partir da raiz
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from core import biblioteca_coberturas
+from core.cobertura import cabe_na_memoria, gerar_cobertura, otimizar_cobertura
+
+# Fechamentos mais pedidos: (v, k, t, m)
+#   v = dezenas na base, k = dezenas por jogo,
+#   t = acertos garantidos, m = dezenas sorteadas
+DESIGNS = (
+    # Lotofácil: bases de 16 a 21 dezenas, jogos de 15
+    [(v, 15, t, 15) for v in range(16, 22) for t in range(11, 15)]
+    # Mega-Sena: bases de 7 a 20 dezenas, jogos de 6
+    + [(v, 6, t, 6) for v in range(7, 21) for t in (4, 5)]
+)
+
+# Trocas da busca local por design; aceita override: python ... 2000000
+TROCAS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+
+def refresh_coberturas():
+    """
+    Calcula (guloso + busca local) cada design da lista e grava na
+    biblioteca os que ficarem menores que os já guardados.
+    """
+    for v, k, t, m in DESIGNS:
+        if not cabe_na_memoria(v, k, m):
+            print(f"({v}, {k}, {t}, {m}) pulado: espaço grande demais.")
+            continue
+
+        base = list(range(1, v + 1))
+        cobertura = gerar_cobertura(base, k, m, t, max_jogos=10**9)
+
+        if not cobertura or cobertura["cobertos"] < cobertura["sorteios_total"]:
+            print(f"({v}, {k}, {t}, {m}) sem cobertura completa.")
+            continue
+
+        jogos = otimizar_cobertura(base, cobertura["jogos"], k, m, t, trocas=TROCAS, celulas=None)
+        gravou = biblioteca_coberturas.salvar_design(v, k, t, m, jogos)
+
+        print(
+            f"({v}, {k}, {t}, {m}): guloso {len(cobertura['jogos'])} -> "
+            f"{len(jogos)} jogos{' (gravado)' if gravou else ''}"
+        )
+
+
+if __name__ == "__main__":
+    refresh_coberturas()
@@ -1,9 +1,15 @@
 # refresh_results_megasena.py
 import requests
 import sqlite3
+import sys
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+# Permite importar o pacote core rodando o script a partir da raiz
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from core.historico import gerar_snapshot
+from core.motor_backtest import atualizar_cache_backtest
+
 # Caminho do DB
 DB_PATH = Path("db/loterias.db")
 DB_PATH.parent.mkdir(exist_ok=True)
@@ -15,6 +21,7 @@ cursor.execute("""
 CREATE TABLE IF NOT EXISTS concursos_megasena (
     concurso INTEGER PRIMARY KEY,
     data TEXT,
+    data_iso TEXT,
     dezena1 INTEGER,
     dezena2 INTEGER,
     dezena3 INTEGER,
@@ -25,6 +32,25 @@ CREATE TABLE IF NOT EXISTS concursos_megasena (
 """)
 conn.commit()
 
+# Coluna com a data já convertida para AAAA-MM-DD (bancos antigos)
+cursor.execute("PRAGMA table_info(concursos_megasena)")
+colunas = [col[1] for col in cursor.fetchall()]
+if "data_iso" not in colunas:
+    cursor.execute("ALTER TABLE concursos_megasena ADD COLUMN data_iso TEXT")
+    conn.commit()
+
+# Rateio (valor pago por faixa de acertos) de cada concurso
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS premios_megasena (
+    concurso INTEGER NOT NULL,
+    acertos INTEGER NOT NULL,
+    ganhadores INTEGER,
+    valor REAL,
+    PRIMARY KEY (concurso, acertos)
+)
+""")
+conn.commit()
+
 # Último concurso salvo
 cursor.execute("SELECT COALESCE(MAX(concurso), 0) FROM concursos_megasena")
 ultimo_salvo = cursor.fetchone()[0]
@@ -38,6 +64,20 @@ ultimo_json = resp.json()
 ultimo_api = ultimo_json.get("numero")
 print("Último concurso na API:", ultimo_api)
 
+# Rateio do payload: faixa 1 = 6 acertos, faixa 2 = 5, ...
+def extrair_premios(concurso, data):
+    premios = []
+    for rateio in data.get("listaRateioPremio") or []:
+        acertos = 7 - int(rateio.get("faixa", 0))
+        if 4 <= acertos <= 6:
+            premios.append((
+                concurso,
+                acertos,
+                int(rateio.get("numeroDeGanhadores") or 0),
+                float(rateio.get("valorPremio") or 0),
+            ))
+    return premios
+
 # Função para baixar um concurso
 def baixar_concurso(concurso):
     try:
@@ -50,7 +90,7 @@ def baixar_concurso(concurso):
             print(f"Concurso {concurso} pulado: número de dezenas incorreto.")
             return None
         print(f"Concurso {concurso} baixado.")
-        return (concurso, data.get("dataApuracao"), *dezenas)
+        return (concurso, data.get("dataApuracao"), *dezenas), extrair_premios(concurso, data)
     except Exception as e:
         print(f"Erro no concurso {concurso}: {e}")
         return None
@@ -68,14 +108,25 @@ def carregar_historico():
     # Retorna lista de sets
     return [set(linha) for linha in linhas]    
 
-# Baixar todos os concursos novos em paralelo
+# Concursos já salvos que ainda não têm rateio (bancos antigos)
+cursor.execute("""
+SELECT concurso FROM concursos_megasena
+WHERE concurso NOT IN (SELECT DISTINCT concurso FROM premios_megasena)
+""")
+sem_rateio = [row[0] for row in cursor.fetchall()]
+print("Concursos sem rateio:", len(sem_rateio))
+
+# Baixar todos os concursos novos (e os sem rateio) em paralelo
 novos_concursos = []
+novos_premios = []
+a_baixar = set(range(ultimo_salvo + 1, ultimo_api + 1)) | set(sem_rateio)
 with ThreadPoolExecutor(max_workers=10) as executor:
-    futures = {executor.submit(baixar_concurso, c): c for c in range(ultimo_salvo + 1, ultimo_api + 1)}
+    futures = {executor.submit(baixar_concurso, c): c for c in sorted(a_baixar)}
     for future in as_completed(futures):
         resultado = future.result()
         if resultado:
-            novos_concursos.append(resultado)
+            novos_concursos.append(resultado[0])
+            novos_premios.extend(resultado[1])
 
 # Inserir todos de uma vez no SQLite
 if novos_concursos:
@@ -87,5 +138,34 @@ if novos_concursos:
     conn.commit()
     print(f"{len(novos_concursos)} concursos inseridos de uma vez!")
 
+if novos_premios:
+    cursor.executemany("""
+    INSERT OR REPLACE INTO premios_megasena (concurso, acertos, ganhadores, valor)
+    VALUES (?, ?, ?, ?)
+    """, novos_premios)
+    conn.commit()
+    print(f"{len(novos_premios)} faixas de rateio gravadas.")
+
+# Converte a data (dd/mm/aaaa da API) uma única vez, na ingestão
+cursor.execute("""
+UPDATE concursos_megasena
+SET data_iso = substr(data, 7, 4) || '-' || substr(data, 4, 2) || '-' || substr(data, 1, 2)
+WHERE data_iso IS NULL AND data LIKE '__/__/____'
+""")
+conn.commit()
+
+# O índice dezena -> concursos agora sai do snapshot (core.indice)
+cursor.execute("DROP TABLE IF EXISTS indice_dezenas")
+conn.commit()
+
 conn.close()
+
+# Snapshot binário (mmap) usado pelos módulos core
+versao = gerar_snapshot("megasena")
+print(f"Snapshot do histórico gerado (versão {versao}).")
+
+# Backtests em cache recebem apenas os concursos novos
+atualizados = atualizar_cache_backtest("megasena")
+print(f"{atualizados} backtests em cache atualizados.")
+
 print("Ingestão completa!")